@@ -7,11 +7,7 @@
 # http://www.sphinx-doc.org/en/master/config
 
 import datetime
-import os
-import sys
-
-sys.path.insert(0, os.path.abspath('../..'))
-import qcfractal
+from importlib.metadata import version as _get_version
 
 # -- Path setup --------------------------------------------------------------
 
@@ -30,10 +26,9 @@ project = 'QCFractal'
 copyright = f'2018-{datetime.datetime.today().year}, The Molecular Sciences Software Institute'
 author = 'The QCArchive Development Team'
 
-# The short X.Y version
-version = qcfractal.__version__
-# The full version, including alpha/beta/rc tags
-release = qcfractal.__version__
+# The short X.Y version and the full version, including alpha/beta/rc tags.
+# Read from the installed package metadata so that qcfractal is never imported here.
+version = release = _get_version('qcfractal')
 
 
 # -- General configuration ---------------------------------------------------
@@ -45,9 +40,13 @@ release = qcfractal.__version__
 # Add any Sphinx extension module names here, as strings. They can be
 # extensions coming with Sphinx (named 'sphinx.ext.*') or your custom
 # ones.
+#
+# The API pages are generated by sphinx-autoapi, which parses the source statically
+# rather than importing qcfractal (and its tornado/sqlalchemy/pydantic stack).
+# sphinx.ext.autodoc is only registered because the autoapi* directives build on
+# its documenters; no plain auto* directive should be used in these docs.
 extensions = [
     'sphinx.ext.autodoc',
-    'sphinx.ext.autosummary',
 #    'sphinx.ext.doctest',
 #    'sphinx.ext.todo',
 #    'sphinx.ext.coverage',
@@ -56,11 +55,33 @@ extensions = [
     'sphinx.ext.napoleon',
     'sphinx.ext.intersphinx',
     'sphinx.ext.extlinks',
-    'sphinx_automodapi.automodapi',
-    'sphinx_automodapi.automodsumm',
-    'nbsphinx'
+    'nbsphinx',
+    'autoapi.extension',
 ]
 
+autoapi_type = 'python'
+autoapi_dirs = ['../../../qcfractal']
+autoapi_ignore = ['*/tests/*', '*/alembic/*', '*/_version.py']
+autoapi_options = ['members', 'undoc-members', 'show-inheritance', 'inherited-members']
+autoapi_keep_files = True
+autoapi_add_toctree_entry = False
+autoapi_python_class_content = 'both'
+
+# Safety net should a plain auto* directive import qcfractal: mock the server-side
+# runtime dependencies so the docs environment never needs them installed.
+autodoc_mock_imports = [
+    'sqlalchemy',
+    'psycopg2',
+    'alembic',
+    'bcrypt',
+    'tornado',
+    'geoip2',
+    'cryptography',
+]
+
+# Notebooks are committed with their outputs, never execute them at build time
+nbsphinx_execute = 'never'
+
 napoleon_google_docstring = False
 napoleon_use_param = False
 napoleon_use_ivar = True
@@ -77,13 +77,15 @@ def upgrade():
     )
     op.add_column("collection", sa.Column("collection_type", sa.String(), nullable=True))
     op.add_column("collection", sa.Column("provenance", sa.JSON(), nullable=True))
-    op.create_index("ix_collection_type", "collection", ["collection_type"], unique=False)
     ### end Alembic commands ###
 
     # ------------ copy data
     print("Start Data migration...")
     migrate_collections()
 
+    # Index once the collections have been re-inserted, rather than maintaining it row by row
+    op.create_index("ix_collection_type", "collection", ["collection_type"], unique=False)
+
 
 def migrate_collections():
     session = Session(bind=op.get_bind())
@@ -7,7 +7,6 @@ Create Date: 2019-11-01 15:39:50.970246
 """
 from alembic import op
 import sqlalchemy as sa
-from sqlalchemy import orm
 from sqlalchemy.dialects import postgresql
 from qcfractal.storage_sockets.models.sql_base import MsgpackExt
 from qcfractal.storage_sockets.models.collections_models import ContributedValuesORM
@@ -23,18 +22,19 @@ depends_on = None
 
 def migrate_contributed_values_data():
 
-    bind = op.get_bind()
-    session = orm.Session(bind=bind)
+    conn = op.get_bind()
+    table = ContributedValuesORM.__table__
 
     # Dataset and reaction datasets tables
-    ds_ids_data = session.execute("select id, contributed_values_data from dataset;").fetchall()
+    ds_ids_data = conn.execute("select id, contributed_values_data from dataset;").fetchall()
     print(f"Migrating datasets with ids: {[ds[0] for ds in ds_ids_data]}")
 
-    rds_ids_data = session.execute("select id, contributed_values_data from reaction_dataset;").fetchall()
+    rds_ids_data = conn.execute("select id, contributed_values_data from reaction_dataset;").fetchall()
     print(f"Migrating reaction datasets with ids: {[ds[0] for ds in rds_ids_data]}")
 
     ds_ids_data.extend(rds_ids_data)
 
+    rows = []
     for ds in ds_ids_data:
         (ds_id, ds_contrib) = ds
         if ds_contrib is None:
@@ -49,13 +49,14 @@ def migrate_contributed_values_data():
 
             dict_values["values"] = np.array(vals)
             dict_values["index"] = np.array(idx)
+            dict_values["collection_id"] = ds_id
 
-            cv = ContributedValuesORM(**dict_values)
-            cv.collection_id = ds_id
+            # executemany needs the same keys in every row
+            rows.append({col.name: dict_values.get(col.name) for col in table.columns})
 
-            session.add(cv)
-
-    session.commit()
+    # Core insert, the MsgpackExt column types still serialize the arrays
+    if rows:
+        conn.execute(table.insert(), rows)
 
 
 def upgrade():
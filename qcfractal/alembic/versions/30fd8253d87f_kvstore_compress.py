@@ -6,7 +6,6 @@ Create Date: 2020-08-30 10:11:57.574292
 
 """
 from alembic import op
-import sqlalchemy as sa
 from sqlalchemy.dialects import postgresql
 
 # revision identifiers, used by Alembic.
@@ -23,19 +22,22 @@ def upgrade():
     compression_enum = postgresql.ENUM("none", "gzip", "bzip2", "lzma", name="compressionenum")
     compression_enum.create(op.get_bind())
 
-    # ### commands auto generated by Alembic - please adjust! ###
-    op.add_column("kv_store", sa.Column("compression", compression_enum, nullable=True))
-    op.add_column("kv_store", sa.Column("compression_level", sa.Integer(), nullable=True))
-    op.add_column("kv_store", sa.Column("data", sa.LargeBinary(), nullable=True))
-    op.alter_column("kv_store", "value", existing_type=postgresql.JSON(astext_type=sa.Text()), nullable=True)
-    # ### end Alembic commands ###
+    # All column changes go in a single ALTER TABLE so the table lock is taken once
+    op.execute(
+        "ALTER TABLE kv_store "
+        "ADD COLUMN compression compressionenum, "
+        "ADD COLUMN compression_level INTEGER, "
+        "ADD COLUMN data BYTEA, "
+        "ALTER COLUMN value DROP NOT NULL"
+    )
 
 
 def downgrade():
-    # ### commands auto generated by Alembic - please adjust! ###
-    op.alter_column("kv_store", "value", existing_type=postgresql.JSON(astext_type=sa.Text()), nullable=False)
-    op.drop_column("kv_store", "data")
-    op.drop_column("kv_store", "compression_level")
-    op.drop_column("kv_store", "compression")
+    op.execute(
+        "ALTER TABLE kv_store "
+        "ALTER COLUMN value SET NOT NULL, "
+        "DROP COLUMN data, "
+        "DROP COLUMN compression_level, "
+        "DROP COLUMN compression"
+    )
     op.execute("DROP TYPE compressionenum")
-    # ### end Alembic commands ###
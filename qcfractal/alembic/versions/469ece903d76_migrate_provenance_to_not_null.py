@@ -17,39 +17,33 @@ branch_labels = None
 depends_on = None
 
 
-def upgrade():
-    conn = op.get_bind()
-    conn.execute(
-        sa.text(
-            "UPDATE base_result SET provenance = provenance::jsonb || '{\"creator\":\"\"}' where (provenance->'creator')::text = 'null'"
-        )
-    )
-    conn.execute(
-        sa.text(
-            "UPDATE base_result SET provenance = provenance::jsonb || '{\"routine\":\"\"}' where (provenance->'routine')::text = 'null'"
-        )
-    )
-    conn.execute(
-        sa.text(
-            "UPDATE base_result SET provenance = provenance::jsonb || '{\"version\":\"\"}' where (provenance->'version')::text = 'null'"
-        )
+def _provenance_update(table, extra_set="", extra_where=""):
+    """
+    Builds a single UPDATE that fills every null provenance field of a table in one pass
+    """
+
+    keys = ["creator", "routine", "version"]
+    merge = " || ".join(
+        f"CASE WHEN (provenance->'{k}')::text = 'null' THEN '{{\"{k}\":\"\"}}'::jsonb ELSE '{{}}'::jsonb END"
+        for k in keys
     )
-    conn.execute(
-        sa.text(
-            "UPDATE molecule SET provenance = provenance::jsonb || '{\"creator\":\"\"}' where (provenance->'creator')::text = 'null'"
-        )
-    )
-    conn.execute(
-        sa.text(
-            "UPDATE molecule SET provenance = provenance::jsonb || '{\"routine\":\"\"}' where (provenance->'routine')::text = 'null'"
-        )
+    where = " OR ".join(f"(provenance->'{k}')::text = 'null'" for k in keys)
+
+    return sa.text(
+        f"UPDATE {table} SET provenance = provenance::jsonb || {merge}{extra_set} WHERE {where}{extra_where}"
     )
+
+
+def upgrade():
+    conn = op.get_bind()
+    conn.execute(_provenance_update("base_result"))
     conn.execute(
-        sa.text(
-            "UPDATE molecule SET provenance = provenance::jsonb || '{\"version\":\"\"}' where (provenance->'version')::text = 'null'"
+        _provenance_update(
+            "molecule",
+            extra_set=", connectivity = CASE WHEN connectivity::text = '[]' THEN null ELSE connectivity END",
+            extra_where=" OR connectivity::text = '[]'",
         )
     )
-    conn.execute(sa.text("UPDATE molecule SET connectivity = null where connectivity::text = '[]'"))
     conn.execute(
         sa.text(
             "UPDATE result SET properties = properties::jsonb - 'mp2_total_correlation_energy' || jsonb_build_object('mp2_correlation_energy', properties->'mp2_total_correlation_energy') WHERE properties::jsonb ? 'mp2_total_correlation_energy'"
@@ -7,7 +7,6 @@ Create Date: 2020-10-29 15:12:53.172977
 """
 from alembic import op
 import sqlalchemy as sa
-from sqlalchemy.dialects.postgresql import JSONB
 
 
 # revision identifiers, used by Alembic.
@@ -21,16 +20,15 @@ def upgrade():
     # ### commands auto generated by Alembic - please adjust! ###
     op.alter_column("grid_optimization_procedure", "initial_molecule", existing_type=sa.INTEGER(), nullable=False)
     op.alter_column("optimization_procedure", "initial_molecule", existing_type=sa.INTEGER(), nullable=False)
-    op.alter_column("base_result", "procedure", existing_type=sa.VARCHAR(length=100), nullable=False)
-    op.alter_column("base_result", "protocols", existing_type=JSONB(astext_type=sa.Text()), nullable=False)
+    # Both base_result columns in one statement, so the large table is scanned and locked once
+    op.execute("ALTER TABLE base_result ALTER COLUMN procedure SET NOT NULL, ALTER COLUMN protocols SET NOT NULL")
     op.alter_column("result", "molecule", existing_type=sa.INTEGER(), nullable=False)
     # ### end Alembic commands ###
 
 
 def downgrade():
     # ### commands auto generated by Alembic - please adjust! ###
-    op.alter_column("base_result", "protocols", existing_type=JSONB(astext_type=sa.Text()), nullable=True)
-    op.alter_column("base_result", "procedure", existing_type=sa.VARCHAR(length=100), nullable=True)
+    op.execute("ALTER TABLE base_result ALTER COLUMN protocols DROP NOT NULL, ALTER COLUMN procedure DROP NOT NULL")
     op.alter_column("result", "molecule", existing_type=sa.INTEGER(), nullable=True)
     op.alter_column("optimization_procedure", "initial_molecule", existing_type=sa.INTEGER(), nullable=True)
     op.alter_column("grid_optimization_procedure", "initial_molecule", existing_type=sa.INTEGER(), nullable=True)
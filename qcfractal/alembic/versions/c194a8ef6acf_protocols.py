@@ -15,12 +15,37 @@ down_revision = "cc54842bb6ba"
 branch_labels = None
 depends_on = None
 
+block_size = 10000
+
 
 def upgrade():
     # ### commands auto generated by Alembic - please adjust! ###
     op.add_column("base_result", sa.Column("protocols", postgresql.JSONB(astext_type=sa.Text()), nullable=True))
-    op.execute("UPDATE base_result SET protocols='{}'::json")
+
+    # Backfill by id range with each block in its own transaction, so the update does not hold
+    # row locks on all of base_result in a single long transaction
+    with op.get_context().autocommit_block():
+        conn = op.get_bind()
+        max_id = conn.execute(sa.text("SELECT max(id) FROM base_result")).scalar() or 0
+        for block in range(0, max_id + 1, block_size):
+            conn.execute(
+                sa.text("UPDATE base_result SET protocols='{}'::json WHERE id >= :lo AND id < :hi"),
+                lo=block,
+                hi=block + block_size,
+            )
+
+    # Validate NOT NULL through a CHECK constraint first. VALIDATE scans the table under a lock
+    # that still allows reads and writes, and PostgreSQL 12+ then uses the valid CHECK to skip the
+    # scan that SET NOT NULL would otherwise perform under an exclusive lock.
+    # Each statement commits on its own so the short ADD CONSTRAINT lock is released before the scan.
+    with op.get_context().autocommit_block():
+        op.execute(
+            "ALTER TABLE base_result ADD CONSTRAINT base_result_protocols_not_null "
+            "CHECK (protocols IS NOT NULL) NOT VALID"
+        )
+        op.execute("ALTER TABLE base_result VALIDATE CONSTRAINT base_result_protocols_not_null")
     op.alter_column("base_result", "protocols", nullable=False)
+    op.execute("ALTER TABLE base_result DROP CONSTRAINT base_result_protocols_not_null")
     op.add_column("result", sa.Column("wavefunction", postgresql.JSONB(astext_type=sa.Text()), nullable=True))
     # ### end Alembic commands ###
 
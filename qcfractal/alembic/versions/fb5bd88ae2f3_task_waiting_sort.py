@@ -17,14 +17,17 @@ depends_on = None
 
 
 def upgrade():
-    op.execute("Create Index ix_task_waiting_sort on task_queue (priority desc, created_on)")
+    # Build the index without locking out managers claiming tasks. CONCURRENTLY cannot run in a transaction.
+    with op.get_context().autocommit_block():
+        op.execute("Create Index Concurrently ix_task_waiting_sort on task_queue (priority desc, created_on)")
     # ### commands auto generated by Alembic - please adjust! ###
     pass
     # ### end Alembic commands ###
 
 
 def downgrade():
-    op.execute("Drop Index ix_task_waiting_sort")
+    with op.get_context().autocommit_block():
+        op.execute("Drop Index Concurrently ix_task_waiting_sort")
     # ### commands auto generated by Alembic - please adjust! ###
     pass
     # ### end Alembic commands ###
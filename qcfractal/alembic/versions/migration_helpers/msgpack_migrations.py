@@ -66,19 +66,33 @@ def json_to_msgpack_table(table_name, block_size, update_columns, transformer, r
     read_columns = [getattr(table.c, x) for x in read_names]
 
     logger.info("Converting data, this may take some time...")
+    last_id = None
     for block in tqdm.tqdm(range(0, num_records, block_size)):
 
-        # Pull chunk to migrate
-        data = connection.execute(
-            sa.select([*read_columns], order_by=table.c.id.asc(), offset=block, limit=block_size)
-        ).fetchall()
+        # Pull chunk to migrate. Page on the id rather than an OFFSET, which would
+        # rescan every previous block.
+        query = sa.select([*read_columns], order_by=table.c.id.asc(), limit=block_size)
+        if last_id is not None:
+            query = query.where(table.c.id > last_id)
+
+        data = connection.execute(query).fetchall()
+        if not data:
+            break
+        last_id = data[-1][0]
 
         # Convert chunk to msgpack
+        rows = []
         for values in data:
             data = {k: v for k, v in zip(read_names, values)}
             row = transformer(data)
+            row["_id"] = data["id"]
+            rows.append(row)
 
-            connection.execute(table.update().where(table.c.id == data["id"]).values(**row))
+        # One executemany per block rather than a round trip per row
+        if rows:
+            update = table.update().where(table.c.id == sa.bindparam("_id"))
+            update = update.values({k: sa.bindparam(k) for k in rows[0] if k != "_id"})
+            connection.execute(update, rows)
 
         connection.execute("commit;")
 
@@ -105,8 +119,10 @@ def json_to_msgpack_table_altercolumns(table_name, update_columns, nullable_true
     new_columns = [getattr(table.c, x) for x in new_names]
 
     logger.info(f"Checking converted columns...")
-    # Pull chunk to migrate
-    data = connection.execute(sa.select([table.c.id, *old_columns, *new_columns], order_by=table.c.id.asc())).fetchall()
+    # Stream the rows through a server-side cursor rather than loading the whole table
+    data = connection.execution_options(stream_results=True).execute(
+        sa.select([table.c.id, *old_columns, *new_columns], order_by=table.c.id.asc())
+    )
     # ], limit=100, order_by=func.random())).fetchall()
 
     col_names = ["id"] + old_names + new_names
@@ -130,10 +130,14 @@ class FractalClient(object):
         from . import _isportal
 
         self._headers["Content-Type"] = f"application/{self.encoding}"
+        self._headers["Accept"] = f"application/{self.encoding}"
         self._headers["User-Agent"] = f"qcportal/{__version__}"
 
         self._request_counter: DefaultDict[Tuple[str, str], int] = defaultdict(int)
 
+        # Reuse connections (and the TLS handshake) between requests to the same server
+        self._session = requests.Session()
+
         ### Define all attributes before this line
 
         # Try to connect and pull general data
@@ -199,6 +203,7 @@ class FractalClient(object):
     def _set_encoding(self, encoding: str) -> None:
         self.encoding = encoding
         self._headers["Content-Type"] = f"application/{self.encoding}"
+        self._headers["Accept"] = f"application/{self.encoding}"
 
     def _request(
         self,
@@ -216,17 +221,11 @@ class FractalClient(object):
         if self._mock_network_error:
             raise requests.exceptions.RequestException("mock_network_error is on, failing by design!")
 
+        if method not in {"get", "post", "put", "delete"}:
+            raise KeyError("Method not understood: '{}'".format(method))
+
         try:
-            if method == "get":
-                r = requests.get(addr, **kwargs)
-            elif method == "post":
-                r = requests.post(addr, **kwargs)
-            elif method == "put":
-                r = requests.put(addr, **kwargs)
-            elif method == "delete":
-                r = requests.delete(addr, **kwargs)
-            else:
-                raise KeyError("Method not understood: '{}'".format(method))
+            r = self._session.request(method, addr, **kwargs)
         except requests.exceptions.SSLError:
             raise ConnectionRefusedError(_ssl_error_msg) from None
         except requests.exceptions.ConnectionError:
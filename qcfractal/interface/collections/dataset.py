@@ -1217,9 +1217,7 @@ class Dataset(Collection):
 
         umols = list(set(molecules))
 
-        ids: List[Optional[ObjectId]] = []
-        submitted: List[ObjectId] = []
-        existing: List[ObjectId] = []
+        responses: List[ComputeResponse] = []
         for compute_set in composition_planner(**dbkeys):
 
             for i in range(0, len(umols), self.client.query_limit):
@@ -1227,10 +1225,7 @@ class Dataset(Collection):
                 ret = self.client.add_compute(
                     **compute_set, molecule=chunk_mols, tag=tag, priority=priority, protocols=protocols
                 )
-
-                ids.extend(ret.ids)
-                submitted.extend(ret.submitted)
-                existing.extend(ret.existing)
+                responses.append(ret)
 
             qhistory = history.copy()
             qhistory["program"] = compute_set["program"]
@@ -1238,7 +1233,7 @@ class Dataset(Collection):
             qhistory["basis"] = compute_set["basis"]
             self._add_history(**qhistory)
 
-        return ComputeResponse(ids=ids, submitted=submitted, existing=existing)
+        return ComputeResponse.merge_many(responses)
 
     @property
     def units(self):
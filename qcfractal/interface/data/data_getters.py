@@ -3,6 +3,7 @@ Assists in grabbing the requisite data
 """
 
 import copy
+import functools
 import glob
 import json
 import os
@@ -63,6 +64,12 @@ def get_molecule(name, orient=True):
     if not fname:
         raise OSError("File: {}/{} not found".format("molecules", name))
 
+    # Parsing and orienting is cached, callers receive their own (mutable) copy
+    return _load_molecule(fname, orient).copy(deep=True)
+
+
+@functools.lru_cache(maxsize=None)
+def _load_molecule(fname, orient):
     return Molecule.from_file(fname, orient=orient)
 
 
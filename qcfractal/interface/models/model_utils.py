@@ -27,8 +27,11 @@ def recursive_normalizer(value: Any, **kwargs: Dict[str, Any]) -> Any:
     """
     Prepare a structure for hashing by lowercasing all values and round all floats
     """
-    digits = kwargs.get("digits", 10)
-    lowercase = kwargs.get("lowercase", True)
+    return _recursive_normalizer(value, kwargs.get("digits", 10), kwargs.get("lowercase", True))
+
+
+def _recursive_normalizer(value: Any, digits: int, lowercase: bool) -> Any:
+    # Options are passed positionally so the walk does not repack kwargs at every level
 
     if isinstance(value, (int, type(None))):
         pass
@@ -38,17 +41,17 @@ def recursive_normalizer(value: Any, **kwargs: Dict[str, Any]) -> Any:
             value = value.lower()
 
     elif isinstance(value, list):
-        value = [recursive_normalizer(x, **kwargs) for x in value]
+        value = [_recursive_normalizer(x, digits, lowercase) for x in value]
 
     elif isinstance(value, tuple):
-        value = tuple(recursive_normalizer(x, **kwargs) for x in value)
+        value = tuple(_recursive_normalizer(x, digits, lowercase) for x in value)
 
     elif isinstance(value, dict):
         ret = {}
         for k, v in value.items():
             if lowercase:
                 k = k.lower()
-            ret[k] = recursive_normalizer(v, **kwargs)
+            ret[k] = _recursive_normalizer(v, digits, lowercase)
         value = ret
 
     elif isinstance(value, np.ndarray):
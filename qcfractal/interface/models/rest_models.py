@@ -2,11 +2,17 @@
 Models for the REST interface
 """
 import functools
+import itertools
 import re
-import warnings
-from typing import Any, Dict, List, Optional, Tuple, Union
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
 
-from pydantic import Field, constr, root_validator, validator
+try:
+    from typing import Literal
+except ImportError:  # Python 3.7
+    from typing_extensions import Literal
+
+from pydantic import Field, validator
+from pydantic.validators import str_validator
 from qcelemental.util import get_base_docs
 
 from .common_models import KeywordSet, Molecule, ObjectId, ProtoModel, KVStore
@@ -29,6 +35,60 @@ __all__ = [
 
 __rest_models = {}
 
+# The usual spellings of each REST verb, so lookups don't need to upper-case them
+_rest_verbs = {}
+for _verb in ("GET", "POST", "PUT", "DELETE"):
+    _rest_verbs.update({_verb: _verb, _verb.lower(): _verb, _verb.capitalize(): _verb})
+
+# Literal endpoints are found with a single dict lookup, endpoints containing
+# regular expressions are matched segment by segment through a trie
+__static_models = {}
+__model_trie = {"children": {}, "params": {}, "models": None}
+
+
+def _is_literal(name: str) -> bool:
+    return re.escape(name) == name
+
+
+def _trie_insert(name: str, models: Dict[str, Tuple[ProtoModel, ProtoModel]]) -> None:
+    node = __model_trie
+    for segment in name.split("/"):
+        if _is_literal(segment):
+            children = node["children"]
+            key = segment
+        else:
+            children = node["params"]
+            key = re.compile(segment)
+
+        if key not in children:
+            children[key] = {"children": {}, "params": {}, "models": None}
+        node = children[key]
+
+    node["models"] = models
+
+
+def _trie_match(node, segments: List[str], rest: str) -> Optional[Tuple[ProtoModel, ProtoModel]]:
+    if not segments:
+        if node["models"]:
+            return node["models"].get(rest)
+        return None
+
+    segment, remaining = segments[0], segments[1:]
+
+    # Literal segments take precedence over patterns, patterns are tried in registration order
+    if segment in node["children"]:
+        match = _trie_match(node["children"][segment], remaining, rest)
+        if match is not None:
+            return match
+
+    for pattern, child in node["params"].items():
+        if pattern.fullmatch(segment):
+            match = _trie_match(child, remaining, rest)
+            if match is not None:
+                return match
+
+    return None
+
 
 def register_model(name: str, rest: str, body: ProtoModel, response: ProtoModel) -> None:
     """
@@ -37,7 +97,8 @@ def register_model(name: str, rest: str, body: ProtoModel, response: ProtoModel)
     Parameters
     ----------
     name : str
-        A regular expression describing the rest endpoint.
+        A regular expression describing the rest endpoint. Each '/' separated
+        segment is matched on its own, so patterns may not span segments.
     rest : str
         The REST endpoint type.
     body : ProtoModel
@@ -53,11 +114,15 @@ def register_model(name: str, rest: str, body: ProtoModel, response: ProtoModel)
 
     if name not in __rest_models:
         __rest_models[name] = {}
+        if _is_literal(name):
+            __static_models[name] = __rest_models[name]
+        else:
+            _trie_insert(name, __rest_models[name])
 
     __rest_models[name][rest] = (body, response)
+    _rest_model.cache_clear()
 
 
-@functools.lru_cache(1000, typed=True)
 def rest_model(resource: str, rest: str) -> Tuple[ProtoModel, ProtoModel]:
     """
     Acquires a REST Model.
@@ -75,31 +140,34 @@ def rest_model(resource: str, rest: str) -> Tuple[ProtoModel, ProtoModel]:
         The (body, response) models of the REST request.
 
     """
-    rest = rest.upper()
-    matches = []
-    for model_re in __rest_models.keys():
-        if re.fullmatch(model_re, resource):
-            try:
-                matches.append(__rest_models[model_re][rest])
-            except KeyError:
-                pass  # Could have different regexes for different endpoint types
-
-    if len(matches) == 0:
-        raise KeyError(f"REST Model for endpoint {resource} could not be found.")
 
-    if len(matches) > 1:
-        warnings.warn(
-            f"Multiple REST models were matched for {rest} request at endpoint {resource}. "
-            f"The following models will be used: {matches[0][0]}, {matches[0][1]}.",
-            RuntimeWarning,
-        )
+    # Normalize before the cached lookup so that "get" and "GET" share an entry
+    verb = _rest_verbs.get(rest)
+    if verb is None:
+        verb = rest.upper()
+
+    return _rest_model(resource, verb)
 
-    return matches[0]
+
+# Resources embed collection ids, so the cache is bounded rather than unlimited
+@functools.lru_cache(1000)
+def _rest_model(resource: str, rest: str) -> Tuple[ProtoModel, ProtoModel]:
+
+    try:
+        return __static_models[resource][rest]
+    except KeyError:
+        pass
+
+    match = _trie_match(__model_trie, resource.split("/"), rest)
+    if match is None:
+        raise KeyError(f"REST Model for endpoint {resource} could not be found.")
+
+    return match
 
 
 ### Generic Types and Common Models
 
-nullstr = constr(regex="null")
+nullstr = Literal["null"]
 
 QueryStr = Optional[Union[List[str], str]]
 QueryInt = Optional[Union[List[int], int]]
@@ -108,11 +176,37 @@ QueryNullObjectId = Optional[Union[List[ObjectId], ObjectId, List[nullstr], null
 QueryListStr = Optional[List[str]]
 
 
+class LowerStr(str):
+    """
+    A string which is lowercased on validation, shared by the fields that are
+    matched case-insensitively instead of a validator per model.
+    """
+
+    @classmethod
+    def __get_validators__(cls):
+        yield str_validator
+        yield cls.to_lower
+
+    @classmethod
+    def to_lower(cls, v: str) -> str:
+        return v if v.islower() else v.lower()
+
+
 class EmptyMeta(ProtoModel):
     """
     There is no metadata accepted, so an empty metadata is sent for completion.
     """
 
+    # No fields and immutable, so field defaults may share a single instance rather than deep-copy it
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+
+_empty_meta = EmptyMeta()
+
 
 class ResponseMeta(ProtoModel):
     """
@@ -190,13 +284,12 @@ class QueryFilter(ProtoModel):
         description="Return all but these columns. Expert-level object. Only one of include and exclude may be specified.",
     )
 
-    @root_validator
-    def check_include_or_exclude(cls, values):
-        include = values.get("include")
-        exclude = values.get("exclude")
-        if (include is not None) and (exclude is not None):
+    # A field validator rather than a root validator, so it only runs when exclude is given
+    @validator("exclude")
+    def check_include_or_exclude(cls, v, values):
+        if (v is not None) and (values.get("include") is not None):
             raise ValueError("Only one of include and exclude may be specified.")
-        return values
+        return v
 
 
 class QueryMetaFilter(QueryMeta, QueryFilter):
@@ -235,22 +328,44 @@ class ComputeResponse(ProtoModel):
         ComputeResponse
             The merged compute response
         """
-        return ComputeResponse(
-            ids=(self.ids + other.ids),
-            submitted=(self.submitted + other.submitted),
-            existing=(self.existing + other.existing),
+        return self.merge_many([self, other])
+
+    @classmethod
+    def merge_many(cls, responses: Iterable["ComputeResponse"]) -> "ComputeResponse":
+        """Merges any number of ComputeResponse objects together, maintaining their order.
+
+        The ids of each response were validated when it was built, so they are not validated again.
+
+        Parameters
+        ----------
+        responses : Iterable[ComputeResponse]
+            The compute responses to merge
+
+        Returns
+        -------
+        ComputeResponse
+            The merged compute response
+        """
+        responses = list(responses)
+        return cls.construct(
+            ids=list(itertools.chain.from_iterable(r.ids for r in responses)),
+            submitted=list(itertools.chain.from_iterable(r.submitted for r in responses)),
+            existing=list(itertools.chain.from_iterable(r.existing for r in responses)),
         )
 
 
-common_docs = {
-    EmptyMeta: str(get_base_docs(EmptyMeta)),
-    ResponseMeta: str(get_base_docs(ResponseMeta)),
-    ResponseGETMeta: str(get_base_docs(ResponseGETMeta)),
-    ResponsePOSTMeta: str(get_base_docs(ResponsePOSTMeta)),
-    QueryMeta: str(get_base_docs(QueryMeta)),
-    QueryMetaFilter: str(get_base_docs(QueryMetaFilter)),
-    ComputeResponse: str(get_base_docs(ComputeResponse)),
-}
+class _CommonDocs(dict):
+    """
+    Maps a model to its rendered base docs, building each entry on first use so
+    that models referenced by many fields only have their docs rendered once.
+    """
+
+    def __missing__(self, model):
+        self[model] = str(get_base_docs(model))
+        return self[model]
+
+
+common_docs = _CommonDocs()
 
 ### Information
 
@@ -381,17 +496,11 @@ register_model("keyword", "POST", KeywordPOSTBody, KeywordPOSTResponse)
 
 class CollectionGETBody(ProtoModel):
     class Data(ProtoModel):
-        collection: str = Field(
+        collection: LowerStr = Field(
             None, description="The specific collection to look up as its identified in the database."
         )
         name: str = Field(None, description="The common name of the collection to look up.")
 
-        @validator("collection")
-        def cast_to_lower(cls, v):
-            if v:
-                v = v.lower()
-            return v
-
     meta: QueryFilter = Field(
         None,
         description="Additional metadata to make with the query. Collections can only have an ``include/exclude`` key in its "
@@ -431,7 +540,7 @@ class CollectionPOSTBody(ProtoModel):
             description="The Id of the object to assign in the database. If 'local', then it will not overwrite "
             "existing keys. There should be very little reason to ever touch this.",
         )
-        collection: str = Field(
+        collection: LowerStr = Field(
             ..., description="The specific identifier for this Collection as it will appear in database."
         )
         name: str = Field(..., description="The common name of this Collection.")
@@ -439,10 +548,6 @@ class CollectionPOSTBody(ProtoModel):
         class Config(ProtoModel.Config):
             extra = "allow"
 
-        @validator("collection")
-        def cast_to_lower(cls, v):
-            return v.lower()
-
     meta: Meta = Field(
         Meta(),
         description="Metadata to specify how the Database should handle adding this Collection if it already exists. "
@@ -492,13 +597,13 @@ class CollectionEntryGETBody(ProtoModel):
             description="Not implemented. " "See qcfractal.interface.collections.dataset_view.DatasetView.get_entries",
         )
 
-    meta: EmptyMeta = Field(EmptyMeta(), description=common_docs[EmptyMeta])
+    meta: EmptyMeta = Field(_empty_meta, description=common_docs[EmptyMeta])
     data: Data = Field(..., description="Information about which entries to return.")
 
 
 class CollectionEntryGETResponse(ProtoModel):
     meta: CollectionSubresourceGETResponseMeta = Field(
-        ..., description=str(get_base_docs(CollectionSubresourceGETResponseMeta))
+        ..., description=common_docs[CollectionSubresourceGETResponseMeta]
     )
     data: Optional[bytes] = Field(..., description="Feather-serialized bytes representing a pandas DataFrame.")
 
@@ -514,13 +619,13 @@ class CollectionMoleculeGETBody(ProtoModel):
             "See qcfractal.interface.collections.dataset_view.DatasetView.get_molecules",
         )
 
-    meta: EmptyMeta = Field(EmptyMeta(), description=common_docs[EmptyMeta])
+    meta: EmptyMeta = Field(_empty_meta, description=common_docs[EmptyMeta])
     data: Data = Field(..., description="Information about which molecules to return.")
 
 
 class CollectionMoleculeGETResponse(ProtoModel):
     meta: CollectionSubresourceGETResponseMeta = Field(
-        ..., description=str(get_base_docs(CollectionSubresourceGETResponseMeta))
+        ..., description=common_docs[CollectionSubresourceGETResponseMeta]
     )
     data: Optional[bytes] = Field(..., description="Feather-serialized bytes representing a pandas DataFrame.")
 
@@ -542,7 +647,7 @@ class CollectionValueGETBody(ProtoModel):
         )
         subset: QueryStr
 
-    meta: EmptyMeta = Field(EmptyMeta(), description=common_docs[EmptyMeta])
+    meta: EmptyMeta = Field(_empty_meta, description=common_docs[EmptyMeta])
     data: Data = Field(..., description="Information about which values to return.")
 
 
@@ -552,7 +657,7 @@ class CollectionValueGETResponse(ProtoModel):
         units: Dict[str, str] = Field(..., description="Units of value columns.")
 
     meta: CollectionSubresourceGETResponseMeta = Field(
-        ..., description=str(get_base_docs(CollectionSubresourceGETResponseMeta))
+        ..., description=common_docs[CollectionSubresourceGETResponseMeta]
     )
     data: Optional[Data] = Field(..., description="Values and units.")
 
@@ -564,13 +669,13 @@ class CollectionListGETBody(ProtoModel):
     class Data(ProtoModel):
         pass
 
-    meta: EmptyMeta = Field(EmptyMeta(), description=common_docs[EmptyMeta])
+    meta: EmptyMeta = Field(_empty_meta, description=common_docs[EmptyMeta])
     data: Data = Field(..., description="Empty for now.")
 
 
 class CollectionListGETResponse(ProtoModel):
     meta: CollectionSubresourceGETResponseMeta = Field(
-        ..., description=str(get_base_docs(CollectionSubresourceGETResponseMeta))
+        ..., description=common_docs[CollectionSubresourceGETResponseMeta]
     )
     data: Optional[bytes] = Field(..., description="Feather-serialized bytes representing a pandas DataFrame.")
 
@@ -846,11 +951,7 @@ class TaskQueuePUTBody(ProtoModel):
         )
 
     class Meta(ProtoModel):
-        operation: str = Field(..., description="The specific action you are taking as part of this update.")
-
-        @validator("operation")
-        def cast_to_lower(cls, v):
-            return v.lower()
+        operation: LowerStr = Field(..., description="The specific action you are taking as part of this update.")
 
     meta: Meta = Field(..., description="The instructions to pass to the target Task from ``data``.")
     data: Data = Field(..., description="The information which contains the Task target in the database.")
@@ -930,6 +1031,29 @@ class ServiceQueuePOSTBody(ProtoModel):
         ..., description="A list the specification for Procedures this Service will manage and generate Tasks for."
     )
 
+    class Config(ProtoModel.Config):
+        # Lets already-built inputs match their own type in the Union without trying the others
+        smart_union = True
+
+    @validator("data", pre=True)
+    def dispatch_on_procedure(cls, v):
+        # Build each input with the model named by its procedure, rather than letting
+        # the Union try (and fail) TorsionDriveInput first for every GridOptimizationInput
+        if not isinstance(v, (list, tuple)):
+            return v
+
+        ret = []
+        for item in v:
+            if isinstance(item, dict):
+                model = _service_input_models.get(str(item.get("procedure", "")).strip())
+                if model is not None:
+                    item = model(**item)
+            ret.append(item)
+        return ret
+
+
+_service_input_models = {"torsiondrive": TorsionDriveInput, "gridoptimization": GridOptimizationInput}
+
 
 class ServiceQueuePOSTResponse(ProtoModel):
 
@@ -946,11 +1070,7 @@ class ServiceQueuePUTBody(ProtoModel):
         procedure_id: QueryObjectId = Field(None, description="The Id of the Procedure that the Service is linked to.")
 
     class Meta(ProtoModel):
-        operation: str = Field(..., description="The update action to perform.")
-
-        @validator("operation")
-        def cast_to_lower(cls, v):
-            return v.lower()
+        operation: LowerStr = Field(..., description="The update action to perform.")
 
     meta: Meta = Field(..., description="The instructions to pass to the targeted Service.")
     data: Data = Field(..., description="The information which contains the Service target in the database.")
@@ -1014,10 +1134,6 @@ class QueueManagerMeta(ProtoModel):
     active_memory: Optional[float] = Field(None, description="The total amount of active memory in GB.")
 
 
-# Add the new QueueManagerMeta to the docs
-common_docs[QueueManagerMeta] = str(get_base_docs(QueueManagerMeta))
-
-
 class QueueManagerGETBody(ProtoModel):
     class Data(ProtoModel):
         limit: int = Field(..., description="Max number of Queue Managers to get from the server.")
@@ -1,7 +1,17 @@
 import pydantic
 import pytest
 
-from ..rest_models import QueryFilter
+from ..gridoptimization import GridOptimizationInput
+from ..rest_models import (
+    CollectionEntryGETBody,
+    CollectionGETBody,
+    ComputeResponse,
+    QueryFilter,
+    ServiceQueuePOSTBody,
+    TaskQueuePUTBody,
+    rest_model,
+)
+from ..torsiondrive import TorsionDriveInput
 
 
 def test_include_exclude_exclusive():
@@ -10,3 +20,78 @@ def test_include_exclude_exclusive():
     QueryFilter(exclude=["goo"])
     with pytest.raises(pydantic.ValidationError):
         QueryFilter(include=["foo"], exclude=["goo"])
+
+
+@pytest.mark.parametrize(
+    "resource, rest, body",
+    [
+        ("molecule", "get", "MoleculeGETBody"),
+        ("molecule", "POST", "MoleculePOSTBody"),
+        ("collection/1234", "delete", "CollectionDELETEBody"),
+        ("collection/1234/entry", "get", "CollectionEntryGETBody"),
+        ("optimization/final_result", "get", "OptimizationFinalResultBody"),
+    ],
+)
+def test_rest_model_lookup(resource, rest, body):
+    assert rest_model(resource, rest)[0].__name__ == body
+
+
+@pytest.mark.parametrize(
+    "resource, rest",
+    [("molecule", "delete"), ("collection/abc", "delete"), ("collection/1234/entries", "get"), ("nothing", "get")],
+)
+def test_rest_model_missing(resource, rest):
+    with pytest.raises(KeyError):
+        rest_model(resource, rest)
+
+
+def test_service_post_dispatch_on_procedure():
+    spec = {
+        "initial_molecule": "1",
+        "optimization_spec": {"program": "geometric", "keywords": {"coordsys": "tric"}},
+        "qc_spec": {"driver": "gradient", "method": "UFF", "basis": "", "keywords": None, "program": "rdkit"},
+    }
+    gridopt = {
+        **spec,
+        "procedure": "gridoptimization",
+        "keywords": {
+            "preoptimization": False,
+            "scans": [{"type": "distance", "indices": [1, 2], "steps": [-0.1, 0.0], "step_type": "relative"}],
+        },
+    }
+    torsiondrive = {
+        **spec,
+        "procedure": "torsiondrive",
+        "keywords": {"dihedrals": [[0, 1, 2, 3]], "grid_spacing": [90]},
+    }
+
+    body = ServiceQueuePOSTBody(meta={}, data=[gridopt, torsiondrive, GridOptimizationInput(**gridopt)])
+    assert [type(x) for x in body.data] == [GridOptimizationInput, TorsionDriveInput, GridOptimizationInput]
+
+
+def test_lowercased_fields():
+    assert CollectionGETBody(data={"collection": "DataSet"}).data.collection == "dataset"
+    assert CollectionGETBody(data={"name": "S22"}).data.collection is None
+    assert TaskQueuePUTBody(meta={"operation": "RESTART"}, data={"id": "1"}).meta.operation == "restart"
+
+
+def test_compute_response_merge():
+    r1 = ComputeResponse(ids=["1", "2"], submitted=["1"], existing=["2"])
+    r2 = ComputeResponse(ids=["3"], submitted=["3"], existing=[])
+    r3 = ComputeResponse(ids=[None], submitted=[], existing=["4"])
+
+    merged = r1.merge(r2)
+    assert merged.ids == ["1", "2", "3"]
+    assert merged.submitted == ["1", "3"]
+    assert merged.existing == ["2"]
+
+    merged = ComputeResponse.merge_many([r1, r2, r3])
+    assert merged.ids == ["1", "2", "3", None]
+    assert merged.existing == ["2", "4"]
+    assert ComputeResponse.merge_many([]).ids == []
+
+
+def test_empty_meta_default_shared():
+    a = CollectionEntryGETBody(data={})
+    b = CollectionEntryGETBody(data={})
+    assert a.meta is b.meta
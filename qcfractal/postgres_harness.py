@@ -321,8 +321,15 @@ Alternatively, you can install a system PostgreSQL manually, please see the foll
         ret = self.pg_ctl(["stop"])
         return ret
 
-    def initialize_postgres(self) -> None:
-        """Initializes and starts the current postgres instance."""
+    def initialize_postgres(self, durable: bool = True) -> None:
+        """Initializes and starts the current postgres instance.
+
+        Parameters
+        ----------
+        durable : bool, optional
+            If False, fsync and synchronous commits are turned off. Only suitable for throwaway
+            instances as the data may be corrupted by a crash.
+        """
 
         self._check_psql()
 
@@ -349,7 +356,10 @@ Alternatively, you can install a system PostgreSQL manually, please see the foll
                 re.M,
             )
 
-            psql_conf_file.write_text(psql_conf)
+        if not durable:
+            psql_conf += "\nfsync = off\nsynchronous_commit = off\nfull_page_writes = off\n"
+
+        psql_conf_file.write_text(psql_conf)
 
         # Start the database
         self.start()
@@ -485,7 +495,8 @@ class TemporaryPostgres:
             config_data["database_name"] = database_name
         self.config = FractalConfig(database=config_data)
         self.psql = PostgresHarness(self.config)
-        self.psql.initialize_postgres()
+        # Unless the directory is kept, all data is lost on shutdown anyways so skip the disk syncs on every commit
+        self.psql.initialize_postgres(durable=bool(tmpdir))
         self.psql.init_database()
 
         atexit.register(self.stop)
@@ -234,9 +234,17 @@ class OptimizationTasks(BaseTasks):
 
         completed_tasks = []
         updates = []
+
+        # Pull all of the existing procedures at once rather than one query per output
+        base_ids = [output["base_result"] for output in opt_outputs]
+        existing_procedures = {}
+        batch_size = self.storage.get_limit(None)
+        for start in range(0, len(base_ids), batch_size):
+            found = self.storage.get_procedures(id=base_ids[start : start + batch_size])["data"]
+            existing_procedures.update((x["id"], x) for x in found)
+
         for output in opt_outputs:
-            rec = self.storage.get_procedures(id=output["base_result"])["data"][0]
-            rec = OptimizationRecord(**rec)
+            rec = OptimizationRecord(**existing_procedures[str(output["base_result"])])
 
             procedure = output["result"]
 
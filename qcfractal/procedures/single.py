@@ -217,15 +217,21 @@ class SingleResultTasks(BaseTasks):
         completed_tasks = []
         updates = []
 
+        # Find the existing result information in the database, for all outputs at once
+        base_ids = [output["base_result"] for output in result_outputs]
+        existing_results = {}
+        batch_size = self.storage.get_limit(None)
+        for start in range(0, len(base_ids), batch_size):
+            found = self.storage.get_results(id=base_ids[start : start + batch_size])["data"]
+            existing_results.update((x["id"], x) for x in found)
+
         for output in result_outputs:
-            # Find the existing result information in the database
             base_id = output["base_result"]
-            existing_result = self.storage.get_results(id=base_id)
-            if existing_result["meta"]["n_found"] != 1:
+            if str(base_id) not in existing_results:
                 raise KeyError(f"Could not find existing base result {base_id}")
 
             # Get the original result data from the dictionary
-            existing_result = existing_result["data"][0]
+            existing_result = existing_results[str(base_id)].copy()
 
             # Some consistency checks:
             # Is this marked as incomplete?
@@ -3,6 +3,7 @@ Queue backend abstraction manager.
 """
 
 import collections
+import logging
 import traceback
 
 import tornado.web
@@ -53,7 +54,9 @@ class TaskQueueHandler(APIHandler):
         body = self.parse_bodymodel(body_model)
 
         tasks = self.storage.get_queue(**{**body.data.dict(), **body.meta.dict()})
-        response = response_model(**tasks)
+
+        # The tasks are already TaskRecords built from database rows, so they are not validated again
+        response = response_model.construct(**tasks)
 
         self.logger.info("GET: TaskQueue - {} pulls.".format(len(response.data)))
         self.write(response)
@@ -164,7 +167,9 @@ class ServiceQueueHandler(APIHandler):
         body = self.parse_bodymodel(body_model)
 
         ret = self.storage.get_services(**{**body.data.dict(), **body.meta.dict()})
-        response = response_model(**ret)
+
+        # Built from database rows, so it is not validated again (the client validates the response)
+        response = response_model.construct(**ret)
 
         self.logger.info("GET: ServiceQueue - {} pulls.\n".format(len(response.data)))
         self.write(response)
@@ -215,91 +220,110 @@ class QueueManagerHandler(APIHandler):
         task_ids = list(results.keys())
 
         manager_name = QueueManagerHandler._get_name_from_metadata(meta)
-        logger.info("QueueManager: Received completed tasks from {}.".format(manager_name))
-        logger.info("              Task ids: " + " ".join(task_ids))
-
-        # Pivot data so that we group all results in categories
-        new_results = collections.defaultdict(list)
-
-        queue = storage_socket.get_queue(id=task_ids)["data"]
-        queue = {v.id: v for v in queue}
+        # Lazy %-formatting, so the id list is only joined when INFO is actually emitted
+        logger.info("QueueManager: Received completed tasks from %s.", manager_name)
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("              Task ids: %s", " ".join(task_ids))
 
         error_data = []
+        completed = []
 
         task_success = 0
         task_failures = 0
-        task_totals = len(results.items())
-
-        for task_id, result in results.items():
-            try:
-                #################################################################
-                # Perform some checks for consistency
-                #################################################################
-                existing_task_data = queue.get(task_id, None)
-
-                # For the first three checks, don't add an error to error_data
-                # We don't want to modify the queue in these cases
-
-                # Does the task exist?
-                if existing_task_data is None:
-                    logger.warning(f"Task id {task_id} does not exist in the task queue.")
-                    task_failures += 1
-
-                # Is the task in the running state
-                elif existing_task_data.status != TaskStatusEnum.running:
-                    logger.warning(f"Task id {task_id} is not in the running state.")
-                    task_failures += 1
-
-                # Was the manager that sent the data the one that was assigned?
-                elif existing_task_data.manager != manager_name:
-                    logger.warning(f"Task id {task_id} belongs to {existing_task_data.manager}, not this manager")
-                    task_failures += 1
-
-                # Failed task
-                elif result["success"] is False:
-                    if "error" not in result:
-                        error = {"error_type": "not_supplied", "error_message": "No error message found on task."}
+        task_totals = len(task_ids)
+
+        # Work through the returned tasks in chunks of at most the storage query limit. Each chunk is
+        # looked up, parsed and written by its own storage calls, so a large return never becomes one
+        # huge transaction (and tasks past the query limit are not wrongly reported as missing)
+        chunk_size = storage_socket.get_limit(None)
+        for chunk_start in range(0, len(task_ids), chunk_size):
+            chunk_ids = task_ids[chunk_start : chunk_start + chunk_size]
+
+            # Pivot data so that we group all results in categories
+            new_results = collections.defaultdict(list)
+            chunk_errors = []
+
+            # Only the columns needed for the consistency checks, as plain dicts. This skips
+            # building (and decoding the spec of) a full TaskRecord for every returned task
+            queue = storage_socket.get_queue(
+                id=chunk_ids, include=["id", "status", "manager", "parser", "base_result_id"], return_json=True
+            )["data"]
+            queue = {v["id"]: v for v in queue}
+
+            for task_id in chunk_ids:
+                result = results[task_id]
+                try:
+                    #################################################################
+                    # Perform some checks for consistency
+                    #################################################################
+                    existing_task_data = queue.get(task_id, None)
+
+                    # For the first three checks, don't add an error to error_data
+                    # We don't want to modify the queue in these cases
+
+                    # Does the task exist?
+                    if existing_task_data is None:
+                        logger.warning(f"Task id {task_id} does not exist in the task queue.")
+                        task_failures += 1
+
+                    # Is the task in the running state
+                    elif existing_task_data["status"] != TaskStatusEnum.running:
+                        logger.warning(f"Task id {task_id} is not in the running state.")
+                        task_failures += 1
+
+                    # Was the manager that sent the data the one that was assigned?
+                    elif existing_task_data["manager"] != manager_name:
+                        logger.warning(
+                            f"Task id {task_id} belongs to {existing_task_data['manager']}, not this manager"
+                        )
+                        task_failures += 1
+
+                    # Failed task
+                    elif result["success"] is False:
+                        if "error" not in result:
+                            error = {"error_type": "not_supplied", "error_message": "No error message found on task."}
+                        else:
+                            error = result["error"]
+
+                        logger.debug(
+                            "Task id {key} did not complete successfully:\n"
+                            "error_type: {error_type}\nerror_message: {error_message}".format(key=str(task_id), **error)
+                        )
+
+                        chunk_errors.append((task_id, error))
+                        task_failures += 1
+
+                    # Success!
                     else:
-                        error = result["error"]
-
-                    logger.debug(
-                        "Task id {key} did not complete successfully:\n"
-                        "error_type: {error_type}\nerror_message: {error_message}".format(key=str(task_id), **error)
-                    )
-
-                    error_data.append((task_id, error))
+                        new_results[existing_task_data["parser"]].append(
+                            {"result": result, "task_id": task_id, "base_result": existing_task_data["base_result_id"]}
+                        )
+                        task_success += 1
+
+                except Exception:
+                    msg = "Internal FractalServer Error:\n" + traceback.format_exc()
+                    error = {"error_type": "internal_fractal_error", "error_message": msg}
+                    logger.error("update: ERROR\n{}".format(msg))
+                    chunk_errors.append((task_id, error))
                     task_failures += 1
 
-                # Success!
-                else:
-                    parser = queue[task_id].parser
-                    new_results[parser].append(
-                        {"result": result, "task_id": task_id, "base_result": queue[task_id].base_result}
-                    )
-                    task_success += 1
-
-            except Exception:
-                msg = "Internal FractalServer Error:\n" + traceback.format_exc()
-                error = {"error_type": "internal_fractal_error", "error_message": msg}
-                logger.error("update: ERROR\n{}".format(msg))
-                error_data.append((task_id, error))
-                task_failures += 1
+            # Run output parsers and handle completed tasks
+            for k, v in new_results.items():
+                procedure_parser = get_procedure_parser(k, storage_socket, logger)
+                com = procedure_parser.handle_completed_output(v)
+                completed.extend(com)
+
+            storage_socket.queue_mark_error(chunk_errors)
+            error_data.extend(chunk_errors)
 
         if task_totals:
             logger.info(
-                "QueueManager: Found {} complete tasks ({} successful, {} failed).".format(
-                    task_totals, task_success, task_failures
-                )
+                "QueueManager: Found %d complete tasks (%d successful, %d failed).",
+                task_totals,
+                task_success,
+                task_failures,
             )
 
-        # Run output parsers and handle completed tasks
-        completed = []
-        for k, v in new_results.items():
-            procedure_parser = get_procedure_parser(k, storage_socket, logger)
-            com = procedure_parser.handle_completed_output(v)
-            completed.extend(com)
-
-        storage_socket.queue_mark_error(error_data)
         return len(completed), len(error_data)
 
     def get(self):
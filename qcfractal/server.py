@@ -25,6 +25,7 @@ from .storage_sockets import ViewHandler, storage_socket_factory
 from .storage_sockets.api_logger import API_AccessLogger
 from .web_handlers import (
     CollectionHandler,
+    CompressedContentEncoding,
     InformationHandler,
     KeywordHandler,
     KVStoreHandler,
@@ -298,8 +299,8 @@ class FractalServer:
         ]
 
         # Build the app
-        app_settings = {"compress_response": compress_response}
-        self.app = tornado.web.Application(endpoints, **app_settings)
+        transforms = [CompressedContentEncoding] if compress_response else []
+        self.app = tornado.web.Application(endpoints, transforms=transforms)
         self.endpoints = set([v[0].replace("/", "", 1) for v in endpoints])
 
         self.http_server = tornado.httpserver.HTTPServer(
@@ -412,6 +413,14 @@ class FractalServer:
         public_info.start()
         self.periodic["public_info"] = public_info
 
+        # Write out the buffered API access logs, even when too few have accumulated for a batch
+        def run_access_log_flush_in_thread():
+            self._run_in_thread(self.storage.flush_access_logs)
+
+        access_logs = tornado.ioloop.PeriodicCallback(run_access_log_flush_in_thread, 10 * 1000)
+        access_logs.start()
+        self.periodic["access_logs"] = access_logs
+
         # Soft quit with a keyboard interrupt
         self.logger.info("FractalServer successfully started.\n")
         if start_loop:
@@ -436,6 +445,12 @@ class FractalServer:
         for cb in self.periodic.values():
             cb.stop()
 
+        # Don't lose any API access logs still waiting to be written, but a failed write must not stop the shutdown
+        try:
+            self.storage.flush_access_logs()
+        except Exception:
+            self.logger.exception("Could not write the remaining API access logs on shutdown.")
+
         # Call exit callbacks
         for func, args, kwargs in self.exit_callbacks:
             func(*args, **kwargs)
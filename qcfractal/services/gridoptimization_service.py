@@ -9,7 +9,7 @@ import numpy as np
 
 from ..extras import get_information
 from ..interface.models import GridOptimizationRecord, Molecule
-from .service_util import BaseService, expand_ndimensional_grid
+from .service_util import BaseService, expand_ndimensional_grid, load_template
 
 __all__ = ["GridOptimizationService"]
 
@@ -128,7 +128,7 @@ class GridOptimizationService(BaseService):
 
         # Special pre-optimization iteration
         if self.iteration == -2:
-            packet = json.loads(self.optimization_template)
+            packet = load_template(self.optimization_template)
             packet["data"] = [self.output.initial_molecule]
 
             self.task_manager.submit_tasks("optimization", {"initial_opt": packet})
@@ -210,30 +210,43 @@ class GridOptimizationService(BaseService):
 
         new_tasks = {}
 
-        for key, mol in task_dict.items():
+        # Parse the templates once, only the constraint values and the molecule differ between grid points
+        opt_template = load_template(self.optimization_template)
+        constraint_template = load_template(self.constraint_template)
 
-            # Update molecule
-            packet = json.loads(self.optimization_template)
+        # Keep existing constraints to support the "extra constraints" feature
+        opt_keywords = opt_template["meta"]["keywords"]
+        extra_constraints = opt_keywords.get("constraints", {})
 
-            # Construct constraints
-            constraints = json.loads(self.constraint_template)
+        # Relative scans are offset by the starting geometry, which is the same for every grid point
+        scans = self.output.keywords.scans
+        offsets = [
+            None if scan.step_type == "absolute" else self.starting_molecule.measure(scan.indices) for scan in scans
+        ]
 
+        for key, mol in task_dict.items():
+
+            # Construct constraints
+            constraints = []
             scan_indices = self.output.deserialize_key(key)
-            for con_num, scan in enumerate(self.output.keywords.scans):
-                idx = scan_indices[con_num]
-                if scan.step_type == "absolute":
-                    constraints[con_num]["value"] = scan.steps[idx]
-                else:
-                    constraints[con_num]["value"] = scan.steps[idx] + self.starting_molecule.measure(scan.indices)
+            for con_num, scan in enumerate(scans):
+                value = scan.steps[scan_indices[con_num]]
+                if offsets[con_num] is not None:
+                    value += offsets[con_num]
 
-            packet["meta"]["keywords"].setdefault("constraints", {})
-            packet["meta"]["keywords"]["constraints"].setdefault("set", [])
-            packet["meta"]["keywords"]["constraints"]["set"].extend(constraints)
+                constraints.append({**constraint_template[con_num], "value": value})
 
-            # Build new molecule
-            packet["data"] = [mol]
+            constraints = {**extra_constraints, "set": extra_constraints.get("set", []) + constraints}
+
+            # Fresh copies of the parts of the meta that are modified when the task is submitted
+            meta = {
+                **opt_template["meta"],
+                "keywords": {**opt_keywords, "constraints": constraints},
+                "qc_spec": dict(opt_template["meta"]["qc_spec"]),
+            }
 
-            new_tasks[key] = packet
+            # Build new molecule
+            new_tasks[key] = {**opt_template, "meta": meta, "data": [mol]}
 
         self.task_manager.submit_tasks("optimization", new_tasks)
         self.grid_optimizations.update(self.task_manager.required_tasks)
@@ -4,6 +4,7 @@ Utilities and base functions for Services.
 
 import abc
 import datetime
+import json
 from typing import Any, Dict, List, Optional, Set, Tuple
 
 from pydantic import validator
@@ -14,6 +15,11 @@ from ..interface.models.rest_models import TaskQueuePOSTBody
 from ..interface.models.task_models import PriorityEnum
 from ..procedures import get_procedure_parser
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 
 class TaskManager(ProtoModel):
 
@@ -36,8 +42,9 @@ class TaskManager(ProtoModel):
         if len(self.required_tasks) == 0:
             return True
 
+        # Duplicate submissions share a procedure, only query each one once
         task_query = self.storage_socket.get_procedures(
-            id=list(self.required_tasks.values()), include=["status", "error"]
+            id=list(set(self.required_tasks.values())), include=["id", "status", "error"]
         )
 
         status_values = set(x["status"] for x in task_query["data"])
@@ -45,12 +52,10 @@ class TaskManager(ProtoModel):
             return True
 
         elif "ERROR" in status_values:
-            for x in task_query["data"]:
-                if x["status"] != "ERROR":
-                    continue
+            error_ids = [x["id"] for x in task_query["data"] if x["status"] == "ERROR"]
 
             self.logger.debug("Error in service compute as follows:")
-            tasks = self.storage_socket.get_queue()["data"]
+            tasks = self.storage_socket.get_queue(base_result=error_ids)["data"]
             for x in tasks:
                 if "error" not in x:
                     continue
@@ -66,11 +71,16 @@ class TaskManager(ProtoModel):
         Pulls currently held tasks.
         """
 
-        ret = {}
-        for k, id in self.required_tasks.items():
-            ret[k] = self.storage_socket.get_procedures(id=id)["data"][0]
+        # Fetch the procedures in batches rather than one query per task. Duplicate
+        # submissions share a procedure, so several keys may map to the same id
+        ids = list(set(self.required_tasks.values()))
+        procedures = {}
+        chunk_size = self.storage_socket.get_limit(None)
+        for i in range(0, len(ids), chunk_size):
+            data = self.storage_socket.get_procedures(id=ids[i : i + chunk_size])["data"]
+            procedures.update({x["id"]: x for x in data})
 
-        return ret
+        return {k: procedures[id] for k, id in self.required_tasks.items()}
 
     def submit_tasks(self, procedure_type: str, tasks: Dict[str, Any]) -> bool:
         """
@@ -78,22 +88,37 @@ class TaskManager(ProtoModel):
         """
         procedure_parser = get_procedure_parser(procedure_type, self.storage_socket, self.logger)
 
-        required_tasks = {}
+        def _submit(meta, data):
+            # Turn packet into a full task, if there are duplicates, get the ID
+            r = procedure_parser.submit_tasks(TaskQueuePOSTBody(meta=meta, data=data))
 
-        # Add in all new tasks
+            if len(r["meta"]["errors"]):
+                raise KeyError("Problem submitting task: {}.".format(r["meta"]["errors"]))
+
+            return r["data"]["ids"]
+
+        # Packets with the same meta (eg, several geometries at one torsiondrive grid point)
+        # are submitted together, so their molecules, procedures and tasks are added in one pass
+        groups = {}
         for key, packet in tasks.items():
             packet["meta"].update({"tag": self.tag, "priority": self.priority})
-            # print("Check tag and priority:", packet)
-            packet = TaskQueuePOSTBody(**packet)
+            meta_key = json.dumps(packet["meta"], sort_keys=True)
+            groups.setdefault(meta_key, (packet["meta"], []))[1].append((key, packet["data"]))
 
-            # Turn packet into a full task, if there are duplicates, get the ID
-            r = procedure_parser.submit_tasks(packet)
+        # Add in all new tasks
+        required_tasks = {}
+        for meta, packets in groups.values():
+            ids = _submit(meta, [mol for _, data in packets for mol in data])
 
-            if len(r["meta"]["errors"]):
-                raise KeyError("Problem submitting task: {}.".format(errors))
+            offset = 0
+            for key, data in packets:
+                required_tasks[key] = ids[offset]
+                offset += len(data)
 
-            # print("Submission:", r["data"])
-            required_tasks[key] = r["data"]["ids"][0]
+                # A molecule repeated within the group has no id of its own, so submit it on its
+                # own to get the id of the (now existing) procedure
+                if required_tasks[key] is None:
+                    required_tasks[key] = _submit(meta, data)[0]
 
         self.required_tasks = required_tasks
 
@@ -218,3 +243,20 @@ def expand_ndimensional_grid(
                 connections.append((seed, new))
 
     return connections
+
+
+def load_template(template: str) -> Any:
+    """
+    Parses a JSON template stored on a service, using orjson when it is installed.
+
+    orjson is stricter than the stdlib parser (eg, it rejects NaN and Infinity, which
+    json.dumps writes by default), so such templates fall back to the stdlib.
+    """
+
+    if orjson is not None:
+        try:
+            return orjson.loads(template)
+        except orjson.JSONDecodeError:
+            pass
+
+    return json.loads(template)
@@ -6,13 +6,14 @@ import io
 import copy
 import json
 import contextlib
+import functools
 from typing import Any, Dict, List
 
 import numpy as np
 
 from ..extras import find_module
 from ..interface.models import TorsionDriveRecord
-from .service_util import BaseService, TaskManager
+from .service_util import BaseService, TaskManager, load_template
 
 __all__ = ["TorsionDriveService"]
 
@@ -26,6 +27,18 @@ def _check_td():
         )
 
 
+@functools.lru_cache(maxsize=4096)
+def _serialize_grid_key(key: str) -> str:
+    """
+    Converts a torsiondrive grid key string to the JSON key used on the TorsionDriveRecord.
+
+    Every grid point is converted again on each iteration, so the conversions are cached.
+    """
+    from torsiondrive import td_api
+
+    return json.dumps(td_api.grid_id_from_string(key))
+
+
 class TorsionDriveService(BaseService):
 
     # Index info
@@ -141,6 +154,19 @@ class TorsionDriveService(BaseService):
 
         complete_tasks = self.task_manager.get_tasks()
 
+        # Lookup the initial and final molecules of all tasks at once, rather than per task
+        mol_ids = set()
+        for ret in complete_tasks.values():
+            mol_ids.add(ret["initial_molecule"])
+            mol_ids.add(ret["final_molecule"])
+
+        mol_ids = list(mol_ids)
+        mol_map = {}
+        chunk_size = self.storage_socket.get_limit(None)
+        for i in range(0, len(mol_ids), chunk_size):
+            mol_data = self.storage_socket.get_molecules(id=mol_ids[i : i + chunk_size])["data"]
+            mol_map.update({x.id: x.geometry for x in mol_data})
+
         # Populate task results
         task_results = {}
         for key, task_ids in self.task_map.items():
@@ -150,15 +176,9 @@ class TorsionDriveService(BaseService):
                 # Cycle through all tasks for this entry
                 ret = complete_tasks[task_id]
 
-                # Lookup molecules
-                initial_id = ret["initial_molecule"]
-                final_id = ret["final_molecule"]
-
-                mol_ids = [initial_id, final_id]
-                mol_data = self.storage_socket.get_molecules(id=mol_ids)["data"]
-                mol_map = {x.id: x.geometry for x in mol_data}
-
-                task_results[key].append((mol_map[initial_id], mol_map[final_id], ret["energies"][-1]))
+                task_results[key].append(
+                    (mol_map[ret["initial_molecule"]], mol_map[ret["final_molecule"]], ret["energies"][-1])
+                )
 
         # The torsiondrive package uses print, so capture that using
         # contextlib
@@ -188,27 +208,35 @@ class TorsionDriveService(BaseService):
         new_tasks = {}
         task_map = {}
 
+        # Parse the templates once. Only the constraints differ between grid points and only the
+        # geometry between molecules, so packets are built from shallow copies of the templates
+        opt_template = load_template(self.optimization_template)
+        dihedral_template = load_template(self.dihedral_template)
+        molecule_template = load_template(self.molecule_template)
+
+        # Keep existing constraints to support the "extra constraints" feature
+        opt_keywords = opt_template["meta"]["keywords"]
+        extra_constraints = opt_keywords.get("constraints", {})
+
         for key, geoms in task_dict.items():
             task_map[key] = []
-            for num, geom in enumerate(geoms):
 
-                # Update molecule
-                packet = json.loads(self.optimization_template)
+            # Construct constraints
+            grid_id = td_api.grid_id_from_string(key)
+            constraints = [{**con, "value": k} for con, k in zip(dihedral_template, grid_id)]
+            constraints = {**extra_constraints, "set": extra_constraints.get("set", []) + constraints}
 
-                # Construct constraints
-                constraints = json.loads(self.dihedral_template)
-                grid_id = td_api.grid_id_from_string(key)
-                for con_num, k in enumerate(grid_id):
-                    constraints[con_num]["value"] = k
-                # update existing constraints to support the "extra constraints" feature
-                packet["meta"]["keywords"].setdefault("constraints", {})
-                packet["meta"]["keywords"]["constraints"].setdefault("set", [])
-                packet["meta"]["keywords"]["constraints"]["set"].extend(constraints)
+            for num, geom in enumerate(geoms):
+
+                # Fresh copies of the parts of the meta that are modified when the task is submitted
+                meta = {
+                    **opt_template["meta"],
+                    "keywords": {**opt_keywords, "constraints": constraints},
+                    "qc_spec": dict(opt_template["meta"]["qc_spec"]),
+                }
 
                 # Build new molecule
-                mol = json.loads(self.molecule_template)
-                mol["geometry"] = geom
-                packet["data"] = [mol]
+                packet = {**opt_template, "meta": meta, "data": [{**molecule_template, "geometry": geom}]}
 
                 task_key = "{}-{}".format(key, num)
                 new_tasks[task_key] = packet
@@ -233,18 +261,17 @@ class TorsionDriveService(BaseService):
         Adds data to the TorsionDriveRecord object
         """
         _check_td()
-        from torsiondrive import td_api
 
         # # Get lowest energies and positions
         min_positions = {}
         final_energy = {}
         for k, v in self.torsiondrive_state["grid_status"].items():
             idx = int(np.argmin([x[2] for x in v]))
-            key = json.dumps(td_api.grid_id_from_string(k))
+            key = _serialize_grid_key(k)
             min_positions[key] = idx
             final_energy[key] = v[idx][2]
 
-        history = {json.dumps(td_api.grid_id_from_string(k)): v for k, v in self.optimization_history.items()}
+        history = {_serialize_grid_key(k): v for k, v in self.optimization_history.items()}
 
         self.output = self.output.copy(
             update={
@@ -344,7 +344,8 @@ class FractalSnowflakeHandler:
             cwd=self._qcfdir.name,
         )  # yapf: disable
 
-        for x in range(timeout * 10):
+        deadline = time.time() + timeout
+        while True:
 
             try:
                 # Client will attempt to connect to the server
@@ -353,8 +354,11 @@ class FractalSnowflakeHandler:
             except ConnectionRefusedError:
                 pass
 
-            time.sleep(0.1)
-        else:
+            # A server that already exited will never come up, do not wait out the timeout
+            if (self._qcfractal_proc.poll() is None) and (time.time() < deadline):
+                time.sleep(0.05)
+                continue
+
             self._running = True
             self.stop()
             out, err = self._qcfractal_proc.communicate()
@@ -116,6 +116,7 @@ class DatabaseStatQueries(QueryBase):
 
     _query_method_map = {
         "table_count": "_table_count",
+        "table_counts": "_table_counts",
         "database_size": "_database_size",
         "table_information": "_table_information",
     }
@@ -128,6 +129,15 @@ class DatabaseStatQueries(QueryBase):
         sql_statement = f"SELECT count(*) from {table_name}"
         return self.execute_query(sql_statement, with_keys=False)[0]
 
+    def _table_counts(self, table_names=None):
+        """Counts the rows of several tables in one statement"""
+
+        if not table_names:
+            self._raise_missing_attribute("table_names", "table names")
+
+        sql_statement = " UNION ALL ".join(f"SELECT '{name}', count(*) from {name}" for name in table_names)
+        return dict(self.execute_query(sql_statement, with_keys=False))
+
     def _database_size(self):
 
         sql_statement = f"SELECT pg_database_size('{self.database_name}')"
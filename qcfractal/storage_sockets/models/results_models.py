@@ -367,10 +367,13 @@ class GridOptimizationProcedureORM(ProcedureMixin, BaseResultORM):
 
     def update_relations(self, grid_optimizations=None, **kwarg):
 
-        self.grid_optimizations_obj = []
-        for key, opt_id in grid_optimizations.items():
-            obj = GridOptimizationAssociation(grid_opt_id=int(self.id), opt_id=int(opt_id), key=key)
-            self.grid_optimizations_obj.append(obj)
+        # Rewrite the associations with one DELETE and one multi-row INSERT. Replacing the
+        # ORM collection instead deletes and inserts the rows one at a time
+        rows = [
+            {"grid_opt_id": int(self.id), "opt_id": int(opt_id), "key": key}
+            for key, opt_id in grid_optimizations.items()
+        ]
+        self._replace_rows(GridOptimizationAssociation.__table__, "grid_opt_id", rows, "grid_optimizations_obj")
 
 
 # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
@@ -494,16 +497,15 @@ class TorsionDriveProcedureORM(ProcedureMixin, BaseResultORM):
             TorsionInitMol.__table__, "torsion_id", "molecule_id", self.id, initial_molecule, self.initial_molecule
         )
 
-        self.optimization_history_obj = []
-        for key in optimization_history:
-            for opt_id in optimization_history[key]:
-                opt_history = OptimizationHistory(torsion_id=int(self.id), opt_id=int(opt_id), key=key)
-                self.optimization_history_obj.append(opt_history)
-
-        # No need for the following because the session is committed with parent save
-        # session.add_all(self.optimization_history_obj)
-        # session.add(self)
-        # session.commit()
+        # Rewrite the history with one DELETE and one multi-row INSERT. Replacing the ORM
+        # collection instead deletes and inserts the rows one at a time. Positions are
+        # numbered across the whole history, as the ordering_list of the relationship does
+        history = [(key, opt_id) for key in optimization_history for opt_id in optimization_history[key]]
+        rows = [
+            {"torsion_id": int(self.id), "opt_id": int(opt_id), "key": key, "position": position}
+            for position, (key, opt_id) in enumerate(history)
+        ]
+        self._replace_rows(OptimizationHistory.__table__, "torsion_id", rows, "optimization_history_obj")
 
 
 # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
@@ -66,6 +66,11 @@ class Base:
     @classmethod
     def _get_fieldnames_with_DB_ids_(cls):
 
+        # Called for every row by to_dict, so inspect each class only once. Checked in the
+        # class __dict__ so that subclasses with more columns build their own list.
+        if "_id_fields" in cls.__dict__:
+            return cls._id_fields
+
         class_inspector = inspect(cls)
         id_fields = []
         for key, col in class_inspector.columns.items():
@@ -73,24 +78,27 @@ class Base:
             if col.primary_key or len(col.foreign_keys) > 0 or key != col.key:
                 id_fields.append(key)
 
+        cls._id_fields = id_fields
         return id_fields
 
     @classmethod
     def _get_col_types(cls):
 
-        # Must use private attributes so that they are not shared by subclasses
-        if hasattr(cls, "__columns") and hasattr(cls, "__hybrids") and hasattr(cls, "__relationships"):
-            return cls.__columns, cls.__hybrids, cls.__relationships
+        # Cached in the class's own __dict__ so that subclasses do not pick up
+        # the (inherited) column lists of their parent
+        cached = cls.__dict__.get("_col_types_cache")
+        if cached is not None:
+            return cached
 
         mapper = inspect(cls)
 
-        cls.__columns = []
-        cls.__hybrids = []
-        cls.__relationships = {}
+        columns = []
+        hybrids = []
+        relationships = {}
         for k, v in mapper.relationships.items():
-            cls.__relationships[k] = {}
-            cls.__relationships[k]["join_class"] = v.argument
-            cls.__relationships[k]["remote_side_column"] = list(v.remote_side)[0]
+            relationships[k] = {}
+            relationships[k]["join_class"] = v.argument
+            relationships[k]["remote_side_column"] = list(v.remote_side)[0]
 
         for k, c in mapper.all_orm_descriptors.items():
 
@@ -101,11 +109,12 @@ class Base:
                 continue
 
             if c.extension_type == HYBRID_PROPERTY:
-                cls.__hybrids.append(k)
+                hybrids.append(k)
             elif k not in mapper.relationships:
-                cls.__columns.append(k)
+                columns.append(k)
 
-        return cls.__columns, cls.__hybrids, cls.__relationships
+        cls._col_types_cache = (columns, hybrids, relationships)
+        return cls._col_types_cache
 
     @classmethod
     def _all_col_names(cls):
@@ -140,6 +149,20 @@ class Base:
                     table.insert().values([{parent_id_name: parent_id_val, child_id_name: my_id} for my_id in to_add])
                 )
 
+    def _replace_rows(self, table, parent_id_name, rows, relationship_name):
+        """Replace all rows of a child table that belong to this object
+        Does NOT commit changes, parent should optimize when it needs to commit
+        The relationship is expired, so it is reloaded on the next access
+        """
+
+        session = object_session(self)
+
+        session.execute(table.delete().where(table.c[parent_id_name] == self.id))
+        if rows:
+            session.execute(table.insert().values(rows))
+
+        session.expire(self, [relationship_name])
+
     def __str__(self):
         if hasattr(self, "id"):
             return str(self.id)
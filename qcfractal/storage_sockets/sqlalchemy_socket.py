@@ -3,7 +3,8 @@ SQLAlchemy Database class to handle access to Pstgres through ORM
 """
 
 try:
-    from sqlalchemy import create_engine, and_, or_, case, func
+    from sqlalchemy import String, any_, bindparam, create_engine, and_, or_, case, func, null, select
+    from sqlalchemy.dialects.postgresql import ARRAY
     from sqlalchemy.exc import IntegrityError
     from sqlalchemy.orm import sessionmaker, with_polymorphic
     from sqlalchemy.sql.expression import desc
@@ -16,6 +17,7 @@ except ImportError:
 import json
 import logging
 import secrets
+import threading
 from collections.abc import Iterable
 from contextlib import contextmanager
 from datetime import datetime as dt
@@ -63,7 +65,7 @@ from qcfractal.storage_sockets.models import (
     VersionsORM,
     WavefunctionStoreORM,
 )
-from qcfractal.storage_sockets.storage_utils import add_metadata_template, get_metadata_template
+from qcfractal.storage_sockets.storage_utils import LRUCache, add_metadata_template, get_metadata_template
 
 from .models import Base
 
@@ -155,11 +157,26 @@ def get_collection_class(collection_type):
     return collection_class
 
 
+def _task_row_to_dict(table, row) -> Dict[str, Any]:
+    """
+    Converts a raw task_queue row into the fields of a TaskRecord, as TaskQueueORM.to_dict does
+    """
+
+    ret = {c.key: row[c] for c in table.c}
+    ret["id"] = str(ret["id"])
+    base_result = ret.pop("base_result_id")
+    ret["base_result"] = str(base_result) if base_result is not None else None
+    return ret
+
+
 class SQLAlchemySocket:
     """
     SQLAlcehmy QCDB wrapper class.
     """
 
+    # Number of queued API access logs that triggers a write (see save_access)
+    access_log_batch_size = 100
+
     def __init__(
         self,
         uri: str,
@@ -170,6 +187,10 @@ class SQLAlchemySocket:
         sql_echo: bool = False,
         max_limit: int = 1000,
         skip_version_check: bool = False,
+        molecule_cache_size: int = 10000,
+        pool_size: int = 5,
+        max_overflow: int = 10,
+        pool_recycle: int = 1800,
     ):
         """
         Constructs a new SQLAlchemy socket
@@ -201,10 +222,20 @@ class SQLAlchemySocket:
 
         # Connect to DB and create session
         self.uri = uri
+        # Connections are pooled and reused across session_scope calls. Connections are
+        # checked before use and recycled periodically so that a restarted or idle-timed-out
+        # database does not surface as an error on the next request.
         self.engine = create_engine(
             uri,
             echo=sql_echo,  # echo for logging into python logging
-            pool_size=5,  # 5 is the default, 0 means unlimited
+            pool_size=pool_size,  # 5 is the default, 0 means unlimited
+            max_overflow=max_overflow,
+            pool_pre_ping=True,
+            pool_recycle=pool_recycle,
+            # executemany() INSERTs (bulk core inserts, ORM flushes of many rows) are sent
+            # as paged multi-row VALUES statements instead of one statement per row
+            executemany_mode="values",
+            executemany_values_page_size=1000,
         )
         self.logger.info(
             "Connected SQLAlchemy to DB dialect {} with driver {}".format(self.engine.dialect.name, self.engine.driver)
@@ -260,6 +291,19 @@ class SQLAlchemySocket:
         self._project_name = project
         self._max_limit = max_limit
 
+        # Molecules are immutable once stored, so lookups by id can be served from memory. The cache is
+        # local to this socket and only invalidated by its own deletes, so it assumes a single writer:
+        # molecules deleted through another server process or connection may still be returned from it.
+        # Use molecule_cache_size=0 to disable the cache when several processes share a database
+        self._molecule_cache = LRUCache(maxsize=molecule_cache_size)
+
+        # Same for keyword sets, which are looked up by hash on every submission
+        self._keywords_id_cache = LRUCache()
+
+        # API access logs are buffered and written in batches (see save_access)
+        self._access_log_buffer = []
+        self._access_log_lock = threading.Lock()
+
     def __str__(self) -> str:
         return f"<SQLAlchemySocket: address='{self.uri}`>"
 
@@ -284,6 +328,8 @@ class SQLAlchemySocket:
 
         # drop all tables that it knows about
         Base.metadata.drop_all(self.engine)
+        self._molecule_cache.clear()
+        self._keywords_id_cache.clear()
 
         # create the tables again
         Base.metadata.create_all(self.engine)
@@ -293,29 +339,34 @@ class SQLAlchemySocket:
     def _delete_DB_data(self, db_name):
         """TODO: needs more testing"""
 
-        with self.session_scope() as session:
+        tables = [
             # Metadata
-            session.query(VersionsORM).delete(synchronize_session=False)
+            VersionsORM,
             # Task and services
-            session.query(TaskQueueORM).delete(synchronize_session=False)
-            session.query(QueueManagerLogORM).delete(synchronize_session=False)
-            session.query(QueueManagerORM).delete(synchronize_session=False)
-            session.query(ServiceQueueORM).delete(synchronize_session=False)
-
+            TaskQueueORM,
+            QueueManagerLogORM,
+            QueueManagerORM,
+            ServiceQueueORM,
             # Collections
-            session.query(CollectionORM).delete(synchronize_session=False)
-
+            CollectionORM,
             # Records
-            session.query(TorsionDriveProcedureORM).delete(synchronize_session=False)
-            session.query(GridOptimizationProcedureORM).delete(synchronize_session=False)
-            session.query(OptimizationProcedureORM).delete(synchronize_session=False)
-            session.query(ResultORM).delete(synchronize_session=False)
-            session.query(WavefunctionStoreORM).delete(synchronize_session=False)
-            session.query(BaseResultORM).delete(synchronize_session=False)
-
+            TorsionDriveProcedureORM,
+            GridOptimizationProcedureORM,
+            OptimizationProcedureORM,
+            ResultORM,
+            WavefunctionStoreORM,
+            BaseResultORM,
             # Auxiliary tables
-            session.query(KVStoreORM).delete(synchronize_session=False)
-            session.query(MoleculeORM).delete(synchronize_session=False)
+            KVStoreORM,
+            MoleculeORM,
+        ]
+
+        # A single TRUNCATE is much cheaper than a DELETE per table, CASCADE only reaches
+        # tables (entries, associations) whose parents are in the list above
+        with self.session_scope() as session:
+            session.execute("TRUNCATE TABLE {} CASCADE".format(", ".join(x.__tablename__ for x in tables)))
+
+        self._molecule_cache.clear()
 
     def get_project_name(self) -> str:
         return self._project_name
@@ -403,9 +454,8 @@ class SQLAlchemySocket:
                         )
                         for res_id in res_ids:
                             join_data[res_id][key] = []
-                            for res in ret:
-                                if res_id == res[0]:
-                                    join_data[res_id][key].append(res[1])
+                        for res in ret:
+                            join_data[res[0]][key].append(res[1])
 
                         for data in rdata:
                             parent_id = data.get("id", data.get("_id"))
@@ -490,11 +540,48 @@ class SQLAlchemySocket:
     # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~ Logging ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
 
     def save_access(self, log_data):
+        """
+        Queues an API access log to be written to the database.
 
-        with self.session_scope() as session:
-            log = AccessLogORM(**log_data)
-            session.add(log)
-            session.commit()
+        Logs are held in memory and written in a single INSERT once access_log_batch_size of them have
+        accumulated, or when flush_access_logs is called (periodically by the server, and when it stops).
+        At most about access_log_batch_size logs are buffered at any time. Those are lost if the process
+        exits without a clean stop (a crash or SIGKILL), or if their INSERT fails.
+        """
+
+        # Build the full row now, so the access date is that of the request rather than of the write
+        row = {c.name: log_data.get(c.name, None) for c in AccessLogORM.__table__.columns if c.name != "id"}
+        if row["access_date"] is None:
+            row["access_date"] = dt.utcnow()
+
+        with self._access_log_lock:
+            self._access_log_buffer.append(row)
+            full = len(self._access_log_buffer) >= self.access_log_batch_size
+
+        if full:
+            self.flush_access_logs()
+
+    def flush_access_logs(self) -> int:
+        """
+        Writes all queued API access logs to the database.
+
+        The queued logs are taken out of the buffer before the INSERT, so they are dropped (and the error
+        raised) if it fails.
+
+        Returns
+        -------
+        int
+            The number of logs written
+        """
+
+        with self._access_log_lock:
+            rows, self._access_log_buffer = self._access_log_buffer, []
+
+        if rows:
+            with self.session_scope() as session:
+                session.execute(AccessLogORM.__table__.insert(), rows)
+
+        return len(rows)
 
     # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~ Logs (KV store) ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
 
@@ -656,8 +743,8 @@ class SQLAlchemySocket:
         results = []
         with self.session_scope() as session:
 
-            # Build out the ORMs
-            orm_molecules = []
+            # Build out the rows
+            mol_rows = []
             for dmol in molecules:
 
                 if dmol.validated is False:
@@ -677,61 +764,53 @@ class SQLAlchemySocket:
                 mol_dict["identifiers"]["molecule_hash"] = mol_dict["molecule_hash"]
                 mol_dict["identifiers"]["molecular_formula"] = mol_dict["molecular_formula"]
 
-                # search by index keywords not by all keys, much faster
-                orm_molecules.append(MoleculeORM(**mol_dict))
+                mol_rows.append(mol_dict)
 
-            # Check if we have duplicates
-            hash_list = [x.molecule_hash for x in orm_molecules]
-            query = format_query(MoleculeORM, molecule_hash=hash_list)
+            # Check if we have duplicates, searching by index keywords not by all keys, much faster
+            hash_list = [x["molecule_hash"] for x in mol_rows]
+            query = format_query(MoleculeORM, molecule_hash=list(set(hash_list)))
             indices = session.query(MoleculeORM.molecule_hash, MoleculeORM.id).filter(*query)
-            previous_id_map = {k: v for k, v in indices}
-
-            # For a bulk add there must be no pre-existing and there must be no duplicates in the add list
-            bulk_ok = len(hash_list) == len(set(hash_list))
-            bulk_ok &= len(previous_id_map) == 0
-            # bulk_ok = False
-
-            if bulk_ok:
-                # Bulk save, doesn't update fields for speed
-                session.bulk_save_objects(orm_molecules)
-                session.commit()
-
-                # Query ID's and reorder based off orm_molecule ordered list
-                query = format_query(MoleculeORM, molecule_hash=hash_list)
-                indices = session.query(MoleculeORM.molecule_hash, MoleculeORM.id).filter(*query)
-
-                id_map = {k: v for k, v in indices}
-                n_inserted = len(orm_molecules)
-
-            else:
-                # Start from old ID map
-                id_map = previous_id_map
-
-                new_molecules = []
-                n_inserted = 0
-
-                for orm_mol in orm_molecules:
-                    duplicate_id = id_map.get(orm_mol.molecule_hash, False)
-                    if duplicate_id is not False:
-                        meta["duplicates"].append(str(duplicate_id))
-                    else:
-                        new_molecules.append(orm_mol)
-                        id_map[orm_mol.molecule_hash] = "placeholder_id"
-                        n_inserted += 1
-                        session.add(orm_mol)
-
-                    # We should make sure there was not a hash collision?
-                    # new_mol.compare(old_mol)
-                    # raise KeyError("!!! WARNING !!!: Hash collision detected")
-
-                session.commit()
-
-                for new_mol in new_molecules:
-                    id_map[new_mol.molecule_hash] = new_mol.id
+            id_map = {k: v for k, v in indices}
+
+            # Only the first occurrence of each new hash is inserted
+            new_rows = {}
+            duplicate_hashes = []
+            for mol_dict in mol_rows:
+                mol_hash = mol_dict["molecule_hash"]
+                if (mol_hash in id_map) or (mol_hash in new_rows):
+                    duplicate_hashes.append(mol_hash)
+                else:
+                    new_rows[mol_hash] = mol_dict
+
+                # We should make sure there was not a hash collision?
+                # new_mol.compare(old_mol)
+                # raise KeyError("!!! WARNING !!!: Hash collision detected")
+
+            # A multi-row VALUES statement takes its columns from the first row, but unset fields are
+            # left out of the molecule dicts. Give every row all columns, as the ORM would: the column
+            # default if there is one, otherwise NULL
+            missing_values = {}
+            for col in MoleculeORM.__table__.columns:
+                if col.primary_key:
+                    continue
+                if (col.default is not None) and col.default.is_scalar:
+                    missing_values[col.name] = col.default.arg
+                else:
+                    missing_values[col.name] = null()
+
+            # Insert the new molecules with multi-row statements, getting the ids back
+            new_rows = [{**missing_values, **row} for row in new_rows.values()]
+            for i in range(0, len(new_rows), 1000):
+                stmt = (
+                    MoleculeORM.__table__.insert()
+                    .values(new_rows[i : i + 1000])
+                    .returning(MoleculeORM.molecule_hash, MoleculeORM.id)
+                )
+                id_map.update({k: v for k, v in session.execute(stmt)})
 
-            results = [str(id_map[x.molecule_hash]) for x in orm_molecules]
-            assert "placeholder_id" not in results
-            meta["n_inserted"] = n_inserted
+            meta["duplicates"] = [str(id_map[x]) for x in duplicate_hashes]
+            results = [str(id_map[x]) for x in hash_list]
+            meta["n_inserted"] = len(new_rows)
 
         meta["success"] = True
 
@@ -750,6 +829,12 @@ class SQLAlchemySocket:
 
         meta = get_metadata_template()
 
+        # Pure lookups by id go through the molecule cache
+        if (id is not None) and (molecule_hash is None) and (molecular_formula is None) and (not skip):
+            ids = [str(x) for x in (id if isinstance(id, (list, tuple)) else [id])]
+            if len(ids) <= self.get_limit(limit):
+                return self._get_molecules_by_id(ids)
+
         query = format_query(MoleculeORM, id=id, molecule_hash=molecule_hash, molecular_formula=molecular_formula)
 
         # Don't include the hash or the molecular_formula in the returned result
@@ -769,6 +854,86 @@ class SQLAlchemySocket:
 
         return {"meta": meta, "data": data}
 
+    def iter_molecules(
+        self,
+        id=None,
+        molecule_hash=None,
+        molecular_formula=None,
+        limit: int = None,
+        skip: int = 0,
+        batch_size: int = 500,
+    ):
+        """
+        Iterates over the molecules matching a query without loading the whole result set.
+
+        Rows are fetched from a server-side cursor ``batch_size`` at a time. Takes the
+        same query arguments as get_molecules.
+
+        Yields
+        ------
+        Molecule
+            The matching molecules, ordered by id.
+        """
+        try:
+            if isinstance(molecular_formula, str):
+                molecular_formula = qcelemental.molutil.order_molecular_formula(molecular_formula)
+            elif isinstance(molecular_formula, list):
+                molecular_formula = [qcelemental.molutil.order_molecular_formula(form) for form in molecular_formula]
+        except ValueError:
+            pass
+
+        query = format_query(MoleculeORM, id=id, molecule_hash=molecule_hash, molecular_formula=molecular_formula)
+
+        with self.session_scope() as session:
+            rows = (
+                session.query(MoleculeORM)
+                .filter(*query)
+                .order_by(MoleculeORM.id)
+                .limit(self.get_limit(limit))
+                .offset(skip)
+                .yield_per(batch_size)
+            )
+            for row in rows:
+                mol_dict = row.to_dict(exclude=["molecule_hash", "molecular_formula"])
+                mol_dict = {k: v for k, v in mol_dict.items() if v is not None}
+                yield Molecule(**mol_dict, validate=False, validated=True)
+
+    def _get_molecules_by_id(self, ids: List[str]):
+        """
+        Returns the molecules for a list of ids, only querying the database for those not in the cache.
+
+        The cache is only invalidated by deletes made through this socket (see __init__).
+        """
+
+        meta = get_metadata_template()
+
+        found = self._molecule_cache.get_many(ids)
+        missing = list({x for x in ids if x not in found})
+
+        if missing:
+            query = format_query(MoleculeORM, id=missing)
+            rdata, _ = self.get_query_projection(
+                MoleculeORM, query, limit=len(missing), exclude=["molecule_hash", "molecular_formula"]
+            )
+
+            # See get_molecules for why the None values are removed
+            fetched = {}
+            for mol_dict in rdata:
+                mol_dict = {k: v for k, v in mol_dict.items() if v is not None}
+                mol = Molecule(**mol_dict, validate=False, validated=True)
+                fetched[str(mol.id)] = mol
+
+            self._molecule_cache.set_many(fetched)
+            found.update(fetched)
+
+        # Unique ids, in the order requested
+        data = [found[x] for x in dict.fromkeys(ids) if x in found]
+
+        meta["n_found"] = len(data)
+        meta["success"] = True
+
+        return {"meta": meta, "data": data}
+
     def del_molecules(self, id: List[str] = None, molecule_hash: List[str] = None):
         """
         Removes a molecule from the database from its hash.
@@ -791,6 +956,11 @@ class SQLAlchemySocket:
         with self.session_scope() as session:
             ret = session.query(MoleculeORM).filter(*query).delete(synchronize_session=False)
 
+        if (molecule_hash is None) and (id is not None):
+            self._molecule_cache.delete_many([str(x) for x in (id if isinstance(id, (list, tuple)) else [id])])
+        else:
+            self._molecule_cache.clear()
+
         return ret
 
     # ~~~~~~~~~~~~~~~~~~~~~~~ Keywords ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
@@ -818,10 +988,19 @@ class SQLAlchemySocket:
 
         meta = add_metadata_template()
 
+        # Ids of keyword sets seen before come from the cache, without a query
+        cached = self._keywords_id_cache.get_many([kw.hash_index for kw in keyword_sets])
+
         keywords = []
         with self.session_scope() as session:
             for kw in keyword_sets:
 
+                if kw.hash_index in cached:
+                    meta["duplicates"].append(cached[kw.hash_index])  # TODO
+                    keywords.append(cached[kw.hash_index])
+                    meta["success"] = True
+                    continue
+
                 kw_dict = kw.dict(exclude={"id"})
 
                 # search by index keywords not by all keys, much faster
@@ -837,6 +1016,9 @@ class SQLAlchemySocket:
                     keywords.append(str(found.id))
                 meta["success"] = True
 
+        # Only cached once committed
+        self._keywords_id_cache.set_many({kw.hash_index: id for kw, id in zip(keyword_sets, keywords)})
+
         ret = {"data": keywords, "meta": meta}
 
         return ret
@@ -909,18 +1091,29 @@ class SQLAlchemySocket:
 
         meta = get_metadata_template()
 
+        # Add all new keyword sets in a single call
+        new_kw_idx = [idx for idx, kw in enumerate(data) if isinstance(kw, KeywordSet)]
+        new_kw_ids = self.add_keywords([data[idx] for idx in new_kw_idx])["data"] if new_kw_idx else []
+        new_kw_map = dict(zip(new_kw_idx, new_kw_ids))
+
         ids = []
         for idx, kw in enumerate(data):
             if isinstance(kw, (int, str)):
-                ids.append(kw)
-
-            elif isinstance(kw, KeywordSet):
-                new_id = self.add_keywords([kw])["data"][0]
-                ids.append(new_id)
+                ids.append(str(kw))
+            elif idx in new_kw_map:
+                ids.append(new_kw_map[idx])
             else:
                 meta["errors"].append((idx, "Data type not understood"))
                 ids.append(None)
 
+        # Fetch all keywords with one query (per max_limit ids) rather than one query per id,
+        # then put them back in the order they were given
+        unique_ids = list({id for id in ids if id is not None})
+        found = {}
+        for start in range(0, len(unique_ids), self._max_limit):
+            batch = unique_ids[start : start + self._max_limit]
+            found.update({kw.id: kw for kw in self.get_keywords(id=batch)["data"]})
+
         missing = []
         ret = []
         for idx, id in enumerate(ids):
@@ -929,11 +1122,7 @@ class SQLAlchemySocket:
                 missing.append(idx)
                 continue
 
-            tmp = self.get_keywords(id=id)["data"]
-            if tmp:
-                ret.append(tmp[0])
-            else:
-                ret.append(None)
+            ret.append(found.get(id, None))
 
         meta["success"] = True
         meta["n_found"] = len(ret) - len(missing)
@@ -960,6 +1149,8 @@ class SQLAlchemySocket:
         with self.session_scope() as session:
             count = session.query(KeywordsORM).filter_by(id=id).delete(synchronize_session=False)
 
+        self._keywords_id_cache.clear()
+
         return count
 
     # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~`
@@ -1496,13 +1687,18 @@ class SQLAlchemySocket:
             number of results deleted
         """
 
+        if isinstance(ids, (int, str)):
+            ids = [ids]
+
+        # A single DELETE on base_result, the result rows (and their tasks) are removed
+        # through the ON DELETE CASCADE foreign keys
         with self.session_scope() as session:
-            results = session.query(ResultORM).filter(ResultORM.id.in_(ids)).all()
-            # delete through session to delete correctly from base_result
-            for result in results:
-                session.delete(result)
-            session.commit()
-            count = len(results)
+            count = (
+                session.query(BaseResultORM)
+                .filter(BaseResultORM.id.in_(ids))
+                .filter(BaseResultORM.result_type == "result")
+                .delete(synchronize_session=False)
+            )
 
         return count
 
@@ -1612,20 +1808,34 @@ class SQLAlchemySocket:
 
         procedure_ids = []
         with self.session_scope() as session:
-            for procedure in record_list:
-                doc = session.query(procedure_class).filter_by(hash_index=procedure.hash_index)
+            # Look up which procedures already exist with one query for the whole batch
+            hash_indices = list({x.hash_index for x in record_list})
+            existing = (
+                session.query(procedure_class.hash_index, procedure_class.id)
+                .filter(procedure_class.hash_index.in_(hash_indices))
+                .all()
+            )
+            existing = {hash_index: str(id) for hash_index, id in existing}
 
-                if get_count_fast(doc) == 0:
+            for procedure in record_list:
+                if procedure.hash_index not in existing:
                     data = procedure.dict(exclude={"id"})
                     proc_db = procedure_class(**data)
                     session.add(proc_db)
-                    session.commit()
+                    # Flush (not commit) to get the id for the relations, so the whole batch,
+                    # including the association rows, is written in one transaction. Expire
+                    # the instance as a commit would, so relations such as initial_molecule
+                    # are reloaded (empty) rather than taken from the constructor arguments
+                    session.flush()
+                    session.expire(proc_db)
                     proc_db.update_relations(**data)
-                    session.commit()
-                    procedure_ids.append(str(proc_db.id))
+
+                    # Later copies of the same procedure in this batch are duplicates of this one
+                    existing[procedure.hash_index] = str(proc_db.id)
+                    procedure_ids.append(existing[procedure.hash_index])
                     meta["n_inserted"] += 1
                 else:
-                    id = str(doc.first().id)
+                    id = existing[procedure.hash_index]
                     meta["duplicates"].append(id)  # TODO
                     procedure_ids.append(id)
         meta["success"] = True
@@ -2034,7 +2244,8 @@ class SQLAlchemySocket:
         int
             Number of deleted active services from database.
         """
-        done = 0
+        procedures = []
+        service_ids = []
         for service in records_list:
             if service.id is None:
                 self.logger.error(
@@ -2042,18 +2253,20 @@ class SQLAlchemySocket:
                 )
                 continue
 
-            # in one transaction
-            with self.session_scope() as session:
-
-                procedure = service.output
-                procedure.__dict__["id"] = service.procedure_id
-                self.update_procedures([procedure])
+            procedure = service.output
+            procedure.__dict__["id"] = service.procedure_id
+            procedures.append(procedure)
+            service_ids.append(int(service.id))
 
-                session.query(ServiceQueueORM).filter_by(id=service.id).delete()  # synchronize_session=False)
+        if not service_ids:
+            return 0
 
-            done += 1
+        # Update all the procedures, then remove all the services in a single statement
+        self.update_procedures(procedures)
+        with self.session_scope() as session:
+            session.query(ServiceQueueORM).filter(ServiceQueueORM.id.in_(service_ids)).delete(synchronize_session=False)
 
-        return done
+        return len(service_ids)
 
     ### Mongo queue handling functions
 
@@ -2149,76 +2362,68 @@ class SQLAlchemySocket:
         waiting tasks to run.
         """
 
-        proc_filt = TaskQueueORM.procedure.in_([p.lower() for p in available_procedures])
+        # The program and procedure lists are bound as single array parameters, so the SQL text
+        # stays the same whatever the manager has installed
+        programs = bindparam("programs", [p.lower() for p in available_programs], type_=ARRAY(String))
+        procedures = bindparam("procedures", [p.lower() for p in available_procedures], type_=ARRAY(String))
+
+        proc_filt = TaskQueueORM.procedure == any_(procedures)
         none_filt = TaskQueueORM.procedure == None  # lgtm [py/test-equals-none]
 
-        order_by = []
-        if tag is not None:
-            if isinstance(tag, str):
-                tag = [tag]
-
-        order_by.extend([TaskQueueORM.priority.desc(), TaskQueueORM.created_on])
-        queries = []
-        if tag is not None:
-            for t in tag:
-                query = format_query(TaskQueueORM, status=TaskStatusEnum.waiting, program=available_programs, tag=t)
-                query.append(or_(proc_filt, none_filt))
-                queries.append(query)
+        query = format_query(TaskQueueORM, status=TaskStatusEnum.waiting)
+        query.append(TaskQueueORM.program == any_(programs))
+        query.append(or_(proc_filt, none_filt))
+
+        # Tags are claimed in the order given, one claim per tag, so tasks of earlier tags come first.
+        # Each claim only orders by (priority desc, created_on), which ix_task_waiting_sort serves
+        # without a sort. A None tag matches any tag.
+        if tag is None:
+            tags = [None]
+        elif isinstance(tag, str):
+            tags = [tag]
         else:
-            query = format_query(TaskQueueORM, status=TaskStatusEnum.waiting, program=available_programs)
-            query.append((or_(proc_filt, none_filt)))
-            queries.append(query)
+            tags = list(dict.fromkeys(tag))
 
-        new_limit = limit
-        found = []
-        update_count = 0
+        order_by = [TaskQueueORM.priority.desc(), TaskQueueORM.created_on]
+
+        table = TaskQueueORM.__table__
+        # modified_on is stamped by the database (as naive UTC, like dt.utcnow()), so all tasks claimed
+        # together share one timestamp. RETURNING hands the value back.
+        update_fields = {
+            "status": TaskStatusEnum.running,
+            "modified_on": func.timezone("UTC", func.now()),
+            "manager": manager,
+        }
 
-        update_fields = {"status": TaskStatusEnum.running, "modified_on": dt.utcnow(), "manager": manager}
+        found = []
         with self.session_scope() as session:
-            for q in queries:
+            for t in tags:
 
                 # Have we found all we needed to find
-                if new_limit == 0:
+                new_limit = limit - len(found)
+                if new_limit <= 0:
                     break
 
-                # with_for_update locks the rows. skip_locked=True makes it skip already-locked rows
-                # (possibly from another process)
-                query = (
-                    session.query(TaskQueueORM)
-                    .filter(*q)
+                tag_query = list(query)
+                if t is not None:
+                    tag_query.append(TaskQueueORM.tag == t)
+
+                # Claim the tasks with a single UPDATE. The subquery locks the candidate rows, and
+                # skip_locked=True makes it skip rows already locked by another process. Tasks claimed
+                # for an earlier tag are no longer waiting, so later claims do not see them again.
+                claim = (
+                    select([table.c.id])
+                    .where(and_(*tag_query))
                     .order_by(*order_by)
                     .limit(new_limit)
                     .with_for_update(skip_locked=True)
                 )
+                stmt = table.update().where(table.c.id.in_(claim)).values(**update_fields).returning(*table.c)
+                new_items = session.execute(stmt).fetchall()
 
-                new_items = query.all()
-                new_ids = [x.id for x in new_items]
-
-                # Update all the task records to reflect this manager claiming them
-                update_count += (
-                    session.query(TaskQueueORM)
-                    .filter(TaskQueueORM.id.in_(new_ids))
-                    .update(update_fields, synchronize_session=False)
-                )
-
-                # After commiting, the row locks are released
-                session.commit()
-
-                # How many more do we have to query
-                new_limit = limit - len(new_items)
-
-                # I would assume this is always true. If it isn't,
-                # that would be really bad, and lead to an infinite loop
-                assert new_limit >= 0
-
-                # Store in dict form for returning. We will add the updated fields later
-                found.extend([task.to_dict(exclude=update_fields.keys()) for task in new_items])
-
-            # avoid another trip to the DB to get the updated values, set them here
-            found = [TaskRecord(**task, **update_fields) for task in found]
-
-        if update_count != len(found):
-            self.logger.warning("QUEUE: Number of found tasks does not match the number of updated tasks.")
+                # RETURNING does not keep the order of the claim, so restore it
+                new_items.sort(key=lambda x: (-x[table.c.priority], x[table.c.created_on]))
+                found.extend(TaskRecord(**_task_row_to_dict(table, row)) for row in new_items)
 
         return found
 
@@ -2263,7 +2468,8 @@ class SQLAlchemySocket:
         skip : int, optional
             skip the first 'skip' results. Used to paginate, default is 0
         return_json : bool, optional
-            Return the results as a list of json inseated of objects, deafult is True
+            Return the results as a list of dicts instead of TaskRecord objects, default is False.
+            Required when 'include' leaves out fields that TaskRecord needs
         with_ids : bool, optional
             Include the ids in the returned objects/dicts, default is True
 
@@ -2294,7 +2500,8 @@ class SQLAlchemySocket:
         except Exception as err:
             meta["error_description"] = str(err)
 
-        data = [TaskRecord(**task) for task in data]
+        if not return_json:
+            data = [TaskRecord(**task) for task in data]
 
         return {"data": data, "meta": meta}
 
@@ -2667,12 +2874,12 @@ class SQLAlchemySocket:
         upd = {key: kwargs[key] for key in QueueManagerORM.__dict__.keys() if key in kwargs}
 
         with self.session_scope() as session:
-            # QueueManagerORM.objects()  # init
+            # Increment an existing manager in place with a single UPDATE, rather than
+            # counting first and reading the counters back into Python
             manager = session.query(QueueManagerORM).filter_by(name=name)
-            if manager.count() > 0:  # existing
-                upd.update(inc_count, modified_on=dt.utcnow())
-                num_updated = manager.update(upd)
-            else:  # create new, ensures defaults and validations
+            num_updated = manager.update({**upd, **inc_count, "modified_on": dt.utcnow()}, synchronize_session=False)
+
+            if num_updated == 0:  # create new, ensures defaults and validations
                 manager = QueueManagerORM(name=name, **upd)
                 session.add(manager)
                 session.commit()
@@ -2936,31 +3143,26 @@ class SQLAlchemySocket:
         if reset_password and password is not None:
             return False, "only one of reset_password and password may be specified"
 
-        with self.session_scope() as session:
-            data = session.query(UserORM).filter_by(username=username).first()
-
-            if data is None:
-                return False, f"User {username} not found."
+        blob = {"username": username}
 
-            blob = {"username": username}
-
-            if permissions is not None:
-                # Make sure permissions are valid
-                if not self._valid_permissions >= set(permissions):
-                    return False, "Permissions not understood: {}".format(set(permissions) - self._valid_permissions)
-                blob["permissions"] = permissions
-            if reset_password:
-                password = self._generate_password()
-            if password is not None:
-                blob["password"] = bcrypt.hashpw(password.encode("UTF-8"), bcrypt.gensalt(6))
+        if permissions is not None:
+            # Make sure permissions are valid
+            if not self._valid_permissions >= set(permissions):
+                return False, "Permissions not understood: {}".format(set(permissions) - self._valid_permissions)
+            blob["permissions"] = permissions
+        if reset_password:
+            password = self._generate_password()
+        if password is not None:
+            blob["password"] = bcrypt.hashpw(password.encode("UTF-8"), bcrypt.gensalt(6))
 
-            count = session.query(UserORM).filter_by(username=username).update(blob)
-            success = count == 1
+        # A single UPDATE, the row count tells us if the user exists
+        with self.session_scope() as session:
+            count = session.query(UserORM).filter_by(username=username).update(blob, synchronize_session=False)
 
-        if success:
+        if count == 1:
             return True, None if password is None else f"New password is {password}"
         else:
-            return False, f"Failed to modify user {username}"
+            return False, f"User {username} not found."
 
     def remove_user(self, username: str) -> bool:
         """Removes a user
@@ -3106,9 +3308,11 @@ class SQLAlchemySocket:
         #     result_states[row["result_type"]][row["status"]] = row["count"]
         result_states = {}
 
-        counts = {}
-        for table in ["collection", "molecule", "base_result", "kv_store", "access_log"]:
-            counts[table] = self.custom_query("database_stats", "table_count", table_name=table)["data"][0]
+        counts = self.custom_query(
+            "database_stats",
+            "table_counts",
+            table_names=["collection", "molecule", "base_result", "kv_store", "access_log"],
+        )["data"]
 
         # Build out final data
         data = {
@@ -3143,11 +3347,19 @@ class SQLAlchemySocket:
             query.append(ServerStatsLogORM.timestamp >= after)
 
         with self.session_scope() as session:
-            pose = session.query(ServerStatsLogORM).filter(*query).order_by(desc("timestamp"))
-            meta["n_found"] = get_count_fast(pose)
+            # The total count comes back with the page, as a window over all matching rows
+            pose = session.query(ServerStatsLogORM, func.count().over()).filter(*query).order_by(desc("timestamp"))
+            rows = pose.limit(self.get_limit(limit)).offset(skip).all()
+
+            if rows:
+                meta["n_found"] = rows[0][1]
+            elif skip:
+                # Paged past the end, so there is no row to carry the count
+                meta["n_found"] = get_count_fast(session.query(ServerStatsLogORM).filter(*query))
+            else:
+                meta["n_found"] = 0
 
-            data = pose.limit(self.get_limit(limit)).offset(skip).all()
-            data = [d.to_dict() for d in data]
+            data = [d.to_dict() for d, _ in rows]
 
         meta["success"] = True
 
@@ -3,6 +3,8 @@ Contains a number of utility functions for storage sockets.
 """
 
 import json
+import threading
+from collections import OrderedDict
 
 # Constants
 _get_metadata = json.dumps({"errors": [], "n_found": 0, "success": False, "missing": [], "error_description": False})
@@ -31,3 +33,52 @@ def add_metadata_template():
     Returns a copy of the metadata for database save/updates.
     """
     return json.loads(_add_metadata)
+
+
+class LRUCache:
+    """
+    A small thread-safe least-recently-used cache with per-key invalidation.
+    """
+
+    def __init__(self, maxsize: int = 10000):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_many(self, keys):
+        """
+        Returns a dictionary of the keys which are present in the cache.
+        """
+        found = {}
+        with self._lock:
+            for k in keys:
+                if k in self._data:
+                    self._data.move_to_end(k)
+                    found[k] = self._data[k]
+        return found
+
+    def set_many(self, items):
+        """
+        Adds a dictionary of items, evicting the least recently used entries as needed.
+        """
+        if self.maxsize <= 0:
+            return
+
+        with self._lock:
+            for k, v in items.items():
+                self._data[k] = v
+                self._data.move_to_end(k)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete_many(self, keys):
+        with self._lock:
+            for k in keys:
+                self._data.pop(k, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
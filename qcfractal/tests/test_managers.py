@@ -6,7 +6,6 @@ import contextlib
 import datetime
 import logging
 import re
-import time
 from multiprocessing import Pool
 
 import pytest
@@ -310,9 +309,12 @@ def test_queue_manager_heartbeat(compute_adapter_fixture):
         assert len(sman) == 1
         assert sman[0]["status"] == "ACTIVE"
 
-        # Make sure interval exceeds heartbeat time
-        time.sleep(1)
-        server.check_manager_heartbeats()
+        # Poll until the heartbeat interval has passed, rather than sleeping a fixed time
+        def manager_inactive():
+            server.check_manager_heartbeats()
+            return server.list_managers(name=manager.name())[0]["status"] == "INACTIVE"
+
+        assert testing.await_true(5, manager_inactive, period=0.05)
 
         sman = server.list_managers(name=manager.name())
         assert len(sman) == 1
@@ -85,6 +85,86 @@ def test_storage_socket(test_server):
     assert len(r["data"]) == 0
 
 
+def test_molecule_accept_msgpack(test_server):
+    """A JSON request may ask for a msgpack-ext reply through the 'Accept' header"""
+    from qcelemental.util import deserialize
+
+    addr = test_server.get_address() + "molecule"
+    headers = {"Accept": "application/msgpack-ext"}
+
+    r = requests.get(addr, json={"meta": {}, "data": {"id": []}}, headers=headers)
+    assert r.status_code == 200, r.reason
+    assert r.headers["Content-Type"] == "application/msgpack-ext"
+
+    pdata = deserialize(r.content, "msgpack-ext")
+    assert pdata["meta"]["success"] is True
+
+    # Without an 'Accept' header the reply matches the request
+    r = requests.get(addr, json={"meta": {}, "data": {"id": []}})
+    assert r.headers["Content-Type"] == "application/json"
+    assert r.json()["meta"]["success"] is True
+
+
+def test_molecule_stream_ndjson(test_server):
+
+    client = ptl.FractalClient(test_server)
+    water = ptl.data.get_molecule("water_dimer_minima.psimol")
+    water2 = ptl.data.get_molecule("water_dimer_stretch.psimol")
+    ids = client.add_molecules([water, water2])
+
+    addr = test_server.get_address() + "molecule"
+    r = requests.get(
+        addr, json={"meta": {}, "data": {"id": ids}}, headers={"Accept": "application/x-ndjson"}, stream=True
+    )
+    assert r.status_code == 200, r.reason
+    assert r.headers["Content-Type"] == "application/x-ndjson"
+
+    lines = [json.loads(x) for x in r.iter_lines() if x]
+    assert sorted(x["id"] for x in lines) == sorted(ids)
+    ptl.Molecule(**lines[0])
+
+
+def test_molecule_zstd_response(test_server):
+    zstandard = pytest.importorskip("zstandard")
+
+    client = ptl.FractalClient(test_server)
+    mols = [ptl.Molecule(symbols=["He", "He"], geometry=[0, 0, 0, 0, 0, x]) for x in range(2, 10)]
+    ids = client.add_molecules(mols)
+
+    addr = test_server.get_address() + "molecule"
+    r = requests.get(
+        addr, json={"meta": {}, "data": {"id": ids}}, headers={"Accept-Encoding": "zstd, gzip"}, stream=True
+    )
+    assert r.status_code == 200, r.reason
+    assert r.headers["Content-Encoding"] == "zstd"
+
+    raw = r.raw.read(decode_content=False)
+    pdata = json.loads(zstandard.ZstdDecompressor().decompressobj().decompress(raw))
+    assert pdata["meta"]["n_found"] == len(ids)
+
+
+def test_molecule_etag(test_server):
+
+    client = ptl.FractalClient(test_server)
+    water = ptl.data.get_molecule("water_dimer_minima.psimol")
+    ids = client.add_molecules([water])
+
+    addr = test_server.get_address() + "molecule"
+    body = {"meta": {}, "data": {"id": ids}}
+
+    r = requests.get(addr, json=body)
+    assert r.status_code == 200, r.reason
+    etag = r.headers["Etag"]
+
+    r = requests.get(addr, json=body, headers={"If-None-Match": etag})
+    assert r.status_code == 304
+    assert r.content == b""
+
+    # A different set of molecules does not match
+    r = requests.get(addr, json={"meta": {}, "data": {"id": []}}, headers={"If-None-Match": etag})
+    assert r.status_code == 200
+
+
 def test_bad_collection_get(test_server):
     for storage_api_addr in [
         test_server.get_address() + "collection/1234/entry",
@@ -83,7 +83,7 @@ def test_kvstore(session, compression, compression_level):
     kv = ptl.models.KVStore.compress(input_str, compression, compression_level)
     log = KVStoreORM(**kv.dict())
     session.add(log)
-    session.commit()
+    session.flush()
 
     q = session.query(KVStoreORM).one()
 
@@ -207,7 +207,7 @@ def test_services(storage_socket, session):
 
     procedure = OptimizationProcedureORM(**proc_data)
     session.add(procedure)
-    session.commit()
+    session.flush()
     assert procedure.id
 
     service_pydantic = TorsionDriveService(**service_data)
@@ -217,11 +217,11 @@ def test_services(storage_socket, session):
     doc.procedure_id = procedure.id
     doc.priority = doc.priority.value  # Special case where we need the value not the enum
     session.add(doc)
-    session.commit()
+    session.flush()
 
     session.delete(doc)
     session.delete(procedure)
-    session.commit()
+    session.flush()
 
     assert session.query(ServiceQueueORM).count() == 0
 
@@ -262,7 +262,7 @@ def test_results_sql(storage_socket, session, molecules_H4O2, kw_fixtures):
 
     result = ResultORM(**page1)
     session.add(result)
-    session.commit()
+    session.flush()
 
     # IMPORTANT: To be able to access lazy loading children use joinedload
     ret = session.query(ResultORM).options(joinedload("molecule_obj")).filter_by(method="m1").first()
@@ -272,7 +272,7 @@ def test_results_sql(storage_socket, session, molecules_H4O2, kw_fixtures):
 
     result2 = ResultORM(**page2)
     session.add(result2)
-    session.commit()
+    session.flush()
     ret = session.query(ResultORM).options(joinedload("molecule_obj")).filter_by(method="m2").first()
     assert ret.molecule_obj.molecular_formula == "H4O2"
     assert ret.method == "m2"
@@ -313,7 +313,7 @@ def test_optimization_procedure(storage_socket, session, molecules_H4O2):
 
     procedure = OptimizationProcedureORM(**data1)
     session.add(procedure)
-    session.commit()
+    session.flush()
     proc = session.query(OptimizationProcedureORM).options(joinedload("initial_molecule_obj")).first()
     assert proc.initial_molecule_obj.molecular_formula == "H4O2"
     assert proc.procedure == "optimization"
@@ -321,12 +321,12 @@ def test_optimization_procedure(storage_socket, session, molecules_H4O2):
     # add a trajectory result
     result = ResultORM(**result1)
     session.add(result)
-    session.commit()
+    session.flush()
     assert result.id
 
     # link result to the trajectory
     proc.trajectory_obj = [Trajectory(opt_id=proc.id, result_id=result.id)]
-    session.commit()
+    session.flush()
     proc = session.query(OptimizationProcedureORM).options(joinedload("trajectory_obj")).first()
     assert proc.trajectory_obj
 
@@ -357,7 +357,7 @@ def test_torsiondrive_procedure(storage_socket, session):
 
     torj_proc = TorsionDriveProcedureORM(**data1)
     session.add(torj_proc)
-    session.commit()
+    session.flush()
 
     # Add optimization_history
 
@@ -365,13 +365,13 @@ def test_torsiondrive_procedure(storage_socket, session):
     opt_proc = OptimizationProcedureORM(**data1)
     opt_proc2 = OptimizationProcedureORM(**data1)
     session.add_all([opt_proc, opt_proc2])
-    session.commit()
+    session.flush()
     assert opt_proc.id
 
     opt_hist = OptimizationHistory(torsion_id=torj_proc.id, opt_id=opt_proc.id, key="20")
     opt_hist2 = OptimizationHistory(torsion_id=torj_proc.id, opt_id=opt_proc2.id, key="20")
     torj_proc.optimization_history_obj = [opt_hist, opt_hist2]
-    session.commit()
+    session.flush()
     torj_proc = session.query(TorsionDriveProcedureORM).options(joinedload("optimization_history_obj")).first()
     assert torj_proc.optimization_history == {"20": [str(opt_proc.id), str(opt_proc2.id)]}
 
@@ -402,11 +402,11 @@ def test_add_task_queue(storage_socket, session, molecules_H4O2):
     # add a task that reference results
     result = ResultORM(**page1)
     session.add(result)
-    session.commit()
+    session.flush()
 
     task = TaskQueueORM(base_result_obj=result, spec={"something": True})
     session.add(task)
-    session.commit()
+    session.flush()
 
     ret = session.query(TaskQueueORM)
     assert ret.count() == 1
@@ -92,6 +92,30 @@ def test_molecules_add_many(storage_socket):
     assert ret == 2
 
 
+def test_molecules_add_mixed_fields(storage_socket):
+    """Molecules in one batch may set different optional fields"""
+
+    he1 = ptl.Molecule(symbols=["He", "He"], geometry=[0, 0, 0, 0, 0, 5])
+    he2 = ptl.Molecule(
+        symbols=["He", "He"], geometry=[0, 0, 0, 0, 0, 6], connectivity=[[0, 1, 1]], comment="bonded helium"
+    )
+
+    ret = storage_socket.add_molecules([he1, he2])
+    assert ret["meta"]["n_inserted"] == 2
+
+    mol1, mol2 = storage_socket.get_molecules(id=ret["data"])["data"]
+    if mol1.id != ret["data"][0]:
+        mol1, mol2 = mol2, mol1
+
+    assert mol1.connectivity is None
+    assert mol2.connectivity == [(0, 1, 1.0)]
+    assert mol2.comment == "bonded helium"
+
+    # Cleanup adds
+    ret = storage_socket.del_molecules(id=ret["data"])
+    assert ret == 2
+
+
 def test_molecules_get(storage_socket):
 
     water = ptl.data.get_molecule("water_dimer_minima.psimol")
@@ -172,6 +196,32 @@ def test_molecules_bad_get(storage_socket):
     assert ret == 1
 
 
+def test_molecules_get_cached(storage_socket):
+
+    water = ptl.data.get_molecule("water_dimer_minima.psimol")
+    water2 = ptl.data.get_molecule("water_dimer_stretch.psimol")
+
+    ids = storage_socket.add_molecules([water, water2])["data"]
+
+    # First pull populates the cache, second is served from it
+    ret1 = storage_socket.get_molecules(id=ids)
+    ret2 = storage_socket.get_molecules(id=[ids[1], ids[0], bad_id1])
+    assert ret2["meta"]["n_found"] == 2
+    assert [x.id for x in ret2["data"]] == [ids[1], ids[0]]
+    ret2["data"][1].compare(ret1["data"][0])
+
+    # Deleted molecules are no longer returned
+    ret = storage_socket.del_molecules(id=ids[0])
+    assert ret == 1
+    ret = storage_socket.get_molecules(id=ids)
+    assert ret["meta"]["n_found"] == 1
+    assert ret["data"][0].id == ids[1]
+
+    ret = storage_socket.del_molecules(molecule_hash=water2.get_hash())
+    assert ret == 1
+    assert storage_socket.get_molecules(id=ids)["meta"]["n_found"] == 0
+
+
 def test_keywords_add(storage_socket):
 
     kw = ptl.models.KeywordSet(**{"values": {"o": 5}, "hash_index": "something_unique"})
@@ -191,6 +241,11 @@ def test_keywords_add(storage_socket):
 
     assert 1 == storage_socket.del_keywords(id=ret_kw.id)
 
+    # Deleted keywords are not served from the id cache
+    ret = storage_socket.add_keywords([kw])
+    assert ret["meta"]["n_inserted"] == 1
+    assert 1 == storage_socket.del_keywords(id=ret["data"][0])
+
 
 def test_keywords_mixed_add_get(storage_socket):
 
@@ -209,6 +264,22 @@ def test_keywords_mixed_add_get(storage_socket):
     assert 1 == storage_socket.del_keywords(id=opts[1].id)
 
 
+def test_access_log_buffered(storage_socket):
+    def access_count():
+        return storage_socket.custom_query("database_stats", "table_count", table_name="access_log")["data"][0]
+
+    n_logs = access_count()
+
+    # Logs are only written once flushed
+    storage_socket.save_access({"access_type": "molecule", "access_method": "GET"})
+    storage_socket.save_access({"access_type": "kvstore", "access_method": "GET", "city": "Blacksburg"})
+    assert access_count() == n_logs
+
+    assert storage_socket.flush_access_logs() == 2
+    assert access_count() == n_logs + 2
+    assert storage_socket.flush_access_logs() == 0
+
+
 def test_collections_add(storage_socket):
 
     collection = "TorsionDriveRecord"
@@ -1313,6 +1384,14 @@ def test_server_log(storage_results):
     ret = storage_results.get_server_stats_log(limit=1)
     assert ret["data"][0]["timestamp"] > now
 
+    # The total is reported for a partial page, and past the last page
+    n_logs = len(storage_results.get_server_stats_log()["data"])
+    assert ret["meta"]["n_found"] == n_logs
+
+    ret = storage_results.get_server_stats_log(skip=n_logs)
+    assert len(ret["data"]) == 0
+    assert ret["meta"]["n_found"] == n_logs
+
 
 def test_collections_include_exclude(storage_socket):
 
@@ -1,12 +1,25 @@
 """
 Web handlers for the FractalServer.
 """
+import hashlib
 import json
 
+import numpy as np
 import tornado.web
 from pydantic import ValidationError
+from pydantic.json import pydantic_encoder
 from qcelemental.util import deserialize, serialize
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
 from .interface.models.rest_models import rest_model
 from .storage_sockets.storage_utils import add_metadata_template
 
@@ -17,6 +30,106 @@ _valid_encodings = {
 }
 
 
+def _negotiate_encoding(accept, content_type):
+    """
+    Picks the response content type. The first type in the 'Accept' header which the
+    server can encode is used, otherwise the reply is sent in the same format as the request.
+    """
+    if accept:
+        for media_range in accept.split(","):
+            media_type = media_range.split(";", 1)[0].strip()
+            if media_type in _valid_encodings:
+                return media_type
+
+    return content_type
+
+
+def _orjson_default(obj):
+    """
+    Encodes the objects orjson does not handle natively, matching the output
+    of the qcelemental JSON encoder (arrays are flattened).
+    """
+    if isinstance(obj, np.ndarray):
+        return obj.ravel().tolist() if obj.shape else obj.tolist()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    return pydantic_encoder(obj)
+
+
+def _serialize_response(data, encoding):
+    """
+    Serializes a response body. Plain JSON goes through orjson when it is installed.
+    """
+    if (encoding == "json") and (orjson is not None):
+        return orjson.dumps(data, default=_orjson_default, option=orjson.OPT_NON_STR_KEYS)
+
+    return serialize(data, encoding)
+
+
+class CompressedContentEncoding(tornado.web.GZipContentEncoding):
+    """
+    Compresses responses with zstd when the client accepts it and zstandard is
+    installed, otherwise falls back to Tornado's gzip encoding.
+
+    Also compresses the msgpack-ext and streamed NDJSON responses, which the
+    gzip transform skips.
+    """
+
+    CONTENT_TYPES = tornado.web.GZipContentEncoding.CONTENT_TYPES | {
+        "application/json-ext",
+        "application/msgpack-ext",
+        "application/x-ndjson",
+    }
+    ZSTD_LEVEL = 3
+
+    def __init__(self, request):
+        super().__init__(request)
+
+        self._zstd = (zstandard is not None) and ("zstd" in request.headers.get("Accept-Encoding", ""))
+        if self._zstd:
+            self._gzipping = False
+
+    def transform_first_chunk(self, status_code, headers, chunk, finishing):
+        if not self._zstd:
+            return super().transform_first_chunk(status_code, headers, chunk, finishing)
+
+        if "Vary" in headers:
+            headers["Vary"] += ", Accept-Encoding"
+        else:
+            headers["Vary"] = "Accept-Encoding"
+
+        ctype = headers.get("Content-Type", "").split(";")[0]
+        self._zstd = (
+            self._compressible_type(ctype)
+            and (not finishing or len(chunk) >= self.MIN_LENGTH)
+            and ("Content-Encoding" not in headers)
+        )
+
+        if self._zstd:
+            headers["Content-Encoding"] = "zstd"
+            self._zstd_obj = zstandard.ZstdCompressor(level=self.ZSTD_LEVEL).compressobj()
+            chunk = self.transform_chunk(chunk, finishing)
+            if "Content-Length" in headers:
+                if finishing:
+                    headers["Content-Length"] = str(len(chunk))
+                else:
+                    del headers["Content-Length"]
+
+        return status_code, headers, chunk
+
+    def transform_chunk(self, chunk, finishing):
+        if not self._zstd:
+            return super().transform_chunk(chunk, finishing)
+
+        chunk = self._zstd_obj.compress(chunk)
+        if finishing:
+            chunk += self._zstd_obj.flush()
+        else:
+            chunk += self._zstd_obj.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+        return chunk
+
+
 class APIHandler(tornado.web.RequestHandler):
     """
     A requests handler for API calls.
@@ -41,8 +154,10 @@ class APIHandler(tornado.web.RequestHandler):
                 status_code=401, reason=f"Did not understand 'Content-Type': {self.content_type}"
             )
 
-        # Always reply in the format sent
-        self.set_header("Content-Type", self.content_type)
+        # Reply in the format asked for, falling back to the format sent
+        self.response_content_type = _negotiate_encoding(self.request.headers.get("Accept"), self.content_type)
+        self.response_encoding = _valid_encodings[self.response_content_type]
+        self.set_header("Content-Type", self.response_content_type)
 
         self.objects = objects
         self.storage = self.objects["storage_socket"]
@@ -126,9 +241,14 @@ class APIHandler(tornado.web.RequestHandler):
         except ValidationError:
             raise tornado.web.HTTPError(status_code=401, reason="Invalid REST")
 
+    def accepts(self, media_type):
+        """Checks if the request lists the media type in its 'Accept' header"""
+        accept = self.request.headers.get("Accept", "")
+        return media_type in (x.split(";", 1)[0].strip() for x in accept.split(","))
+
     def write(self, data):
         if not isinstance(data, (str, bytes)):
-            data = serialize(data, self.encoding)
+            data = _serialize_response(data, self.response_encoding)
 
         return super().write(data)
 
@@ -215,7 +335,7 @@ class MoleculeHandler(APIHandler):
     _required_auth = "read"
     _logging_param_counts = {"id"}
 
-    def get(self):
+    async def get(self):
         """
 
         Experimental documentation, need to find a decent format.
@@ -239,12 +359,56 @@ class MoleculeHandler(APIHandler):
         body_model, response_model = rest_model("molecule", "get")
         body = self.parse_bodymodel(body_model)
 
+        # Large exports can be streamed one molecule per line
+        if self.accepts("application/x-ndjson"):
+            await self._stream_molecules(body)
+            return
+
         molecules = self.storage.get_molecules(**{**body.data.dict(), **body.meta.dict()})
         ret = response_model(**molecules)
 
+        # Stored molecules never change, so their ids and hashes identify the response.
+        # Clients holding the same set get a 304 without the body being serialized.
+        etag = hashlib.sha1(self.response_encoding.encode())
+        for mol in ret.data:
+            mol_hash = mol.identifiers.molecule_hash if mol.identifiers else mol.get_hash()
+            etag.update(f"{mol.id}:{mol_hash};".encode())
+        self.set_header("Etag", f'"{etag.hexdigest()}"')
+
+        if self.check_etag_header():
+            self.set_status(304)
+            self.logger.info("GET: Molecule - {} not modified.".format(len(ret.data)))
+            return
+
         self.logger.info("GET: Molecule - {} pulls.".format(len(ret.data)))
         self.write(ret)
 
+    async def _stream_molecules(self, body, flush_every=500):
+        """
+        Writes the molecules matching a query as newline-delimited JSON, sending each
+        chunk to the client as rows arrive instead of building the full response in memory.
+        """
+
+        self.set_header("Content-Type", "application/x-ndjson")
+
+        n_found = 0
+        molecules = self.storage.iter_molecules(**{**body.data.dict(), **body.meta.dict()}, batch_size=flush_every)
+        try:
+            for mol in molecules:
+                line = _serialize_response(mol, "json")
+                if isinstance(line, str):
+                    line = line.encode()
+                super().write(line + b"\n")
+                n_found += 1
+                if n_found % flush_every == 0:
+                    await self.flush()
+        finally:
+            # Closing the generator ends its session and releases the server-side cursor,
+            # also when the client goes away mid-stream
+            molecules.close()
+
+        self.logger.info("GET: Molecule - {} streamed.".format(n_found))
+
     def post(self):
         """
             Experimental documentation, need to find a decent format.
@@ -427,7 +591,9 @@ class ResultHandler(APIHandler):
         body = self.parse_bodymodel(body_model)
 
         ret = self.storage.get_results(**{**body.data.dict(), **body.meta.dict()})
-        result = response_model(**ret)
+
+        # Built from database rows, so it is not validated again (the client validates the response)
+        result = response_model.construct(**ret)
 
         self.logger.info("GET: Results - {} pulls.".format(len(result.data)))
         self.write(result)
@@ -454,7 +620,8 @@ class ProcedureHandler(APIHandler):
         except KeyError as e:
             raise tornado.web.HTTPError(status_code=401, reason=str(e))
 
-        response = response_model(**ret)
+        # Built from database rows, so it is not validated again (the client validates the response)
+        response = response_model.construct(**ret)
 
         self.logger.info("GET: Procedures - {} pulls.".format(len(response.data)))
         self.write(response)
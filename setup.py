@@ -35,8 +35,8 @@ if __name__ == "__main__":
             "bcrypt",
             "cryptography",
             # Storage dependencies
-            "sqlalchemy >=1.3,<1.4",
-            "alembic",
+            "sqlalchemy >=1.3.7,<1.4",
+            "alembic >=1.2",
             "psycopg2 >=2.7",
             # QCPortal dependencies
             "tqdm",
@@ -58,6 +58,8 @@ if __name__ == "__main__":
         },
         extras_require={
             "api_logging": ["geoip2"],
+            "fast_json": ["orjson"],
+            "compression": ["zstandard"],
             "docs": [
                 "sphinx==1.2.3",  # autodoc was broken in 1.3.1
                 "sphinxcontrib-napoleon",